@@ -8,6 +8,7 @@ import data
 import enums
 import board
 
+import math
 import os
 import pygame
 
@@ -80,11 +81,16 @@ BASE_WIDTH = 1920
 BASE_HEIGHT = 1080
 ASPECT_RATIO = BASE_WIDTH / BASE_HEIGHT
 
+# Max number of scaled images kept in Artifacts.scaleCache.
+SCALE_CACHE_SIZE = 256
+
 
 def import_img() -> None:
     """ Map artifacts to image filenames, and appropriately scale the image.
         Sets up images to be ready to display for current display dimension.
         Separate alpha scaling for transparent images.
+        The full resolution files are smoothscaled down to their base size once, so every
+        later resize scales from a small baseline instead of the original file.
     """
 
     # Maps the name of an artifact to it's filename.
@@ -116,7 +122,7 @@ def import_img() -> None:
 
     # convert()
     for key in imgMap:
-        Artifacts.imgs[key] = pygame.transform.scale(pygame.image.load("images/" + imgMap.get(key)).convert(), ART_SIZES[key])
+        Artifacts.imgs[key] = pygame.transform.smoothscale(pygame.image.load("images/" + imgMap.get(key)).convert(), ART_SIZES[key])
 
     # convert_alpha()
     for key in imgMapAlpha: # fromTile is the size of a tile
@@ -125,7 +131,7 @@ def import_img() -> None:
         if key.isnumeric():
             sizeKey = "fromTile"
             
-        Artifacts.imgs[key] = pygame.transform.scale(pygame.image.load("images/" + imgMapAlpha.get(key)).convert_alpha(), ART_SIZES[sizeKey])
+        Artifacts.imgs[key] = pygame.transform.smoothscale(pygame.image.load("images/" + imgMapAlpha.get(key)).convert_alpha(), ART_SIZES[sizeKey])
 
 
 def import_sound() -> None:
@@ -187,10 +193,35 @@ class Artifacts():
     saveSize = savePos = None
     saveTextFont = None
 
+    # Top left pixel coordinates of each tile, indexed by 64sq.
+    destCoords = []
+    # The (width, height) of the screen the artifacts were last computed for.
+    lastSize = None
+    # Rects of the clickable artifacts, a list of rects for artifacts with multiple buttons.
+    rects = {}
+
     # Maps    
     imgs = {}
     scaledImgs = {}
-    pieceImgsPos = {}
+    # Scaled images keyed by (image key, (width, height)), oldest first.
+    scaleCache = {}
+    # Loaded fonts keyed by (font attribute, pixel size).
+    fontCache = {}
+    # Rendered PGN words keyed by word, cleared whenever the PGN font changes.
+    pgnWordCache = {}
+    # The rendered "PGN:" header.
+    pgnHeaderSurface = None
+    # The rendered turn indicator and settings labels, keyed by text.
+    textCache = {}
+    # Pre-filled surfaces of the settings menu rects, keyed by ("res", index, selected), ("fs", index) or "save".
+    settingsRectSurfs = {}
+    # Every scaled piece image packed into one surface, the piece entries of scaledImgs are subsurfaces of it.
+    pieceAtlas = None
+    # The side of the latest promotion menu, as in Move.prom, and the (image, destination) of each of its pieces.
+    promSide = 0
+    promBlits = []
+    # The (image, destination) of every occupied square, blitted in one call each frame.
+    pieceBlits = []
     sounds = {}
 
 
@@ -201,6 +232,12 @@ def calculate_resize(screenWidth, screenHeight, gameBoard) -> None:
     :param screenHeight: The current screen height to scale by.
     :param gameBoard: The game board object including information for each successive turn.
     """
+    # Skip if the artifacts were already computed for this screen size.
+    if (screenWidth, screenHeight) == Artifacts.lastSize:
+        return
+
+    Artifacts.lastSize = (screenWidth, screenHeight)
+
     # Scale by the min of current screen height and current screen width.
     if screenWidth / screenHeight < ASPECT_RATIO:
         currDim = screenWidth
@@ -210,13 +247,19 @@ def calculate_resize(screenWidth, screenHeight, gameBoard) -> None:
         baseDim = BASE_HEIGHT
 
     resize_general_attrs(screenWidth, currDim, baseDim)
+    resize_dest_coords()
     resize_misc_attrs(screenWidth, screenHeight, currDim, baseDim)
     resize_settings_bttns(currDim, baseDim)
+    resize_settings_rects()
+    update_rects()
 
     text_resize(screenWidth, screenHeight, currDim, baseDim)
 
-    update_pieces(gameBoard)
+    update_pieces()
     update_imgs()
+
+    if Artifacts.promSide:
+        set_prom_blits()
     set_piece_imgs_positions(gameBoard)
 
 
@@ -229,13 +272,15 @@ def resize_misc_attrs(screenWidth, screenHeight, currDim, baseDim) -> None:
     :param currDim: Screen width if the width drops below the aspect ratio, else screen height.
     :param baseDim: BASE_WIDTH or BASE_HEIGHT, matching currDim.
     """
+    scale = currDim / baseDim
+
     # Set sideNavBar, height is screen height and floats right.
-    Artifacts.sideNavBarSize = (currDim / (baseDim / ART_SIZES["sideNavBar"][0]), screenHeight)
+    Artifacts.sideNavBarSize = (ART_SIZES["sideNavBar"][0] * scale, screenHeight)
     Artifacts.sideNavBarPos = (screenWidth - Artifacts.sideNavBarSize[0], ART_POS["sideNavBar"][1])
 
     # Set save button, floats bottom of screen.
-    Artifacts.saveSize = (currDim / (baseDim / ART_SIZES["save"][0]),  currDim / (baseDim / ART_SIZES["save"][1]))
-    Artifacts.savePos = (screenWidth / (BASE_WIDTH / ART_POS["save"][0]), screenHeight - Artifacts.saveSize[1])
+    Artifacts.saveSize = (ART_SIZES["save"][0] * scale, ART_SIZES["save"][1] * scale)
+    Artifacts.savePos = (ART_POS["save"][0] * screenWidth / BASE_WIDTH, screenHeight - Artifacts.saveSize[1])
 
 
 def resize_general_attrs(screenWidth, currDim, baseDim) -> None:
@@ -246,19 +291,29 @@ def resize_general_attrs(screenWidth, currDim, baseDim) -> None:
     :param currDim: Screen width if the width drops below the aspect ratio, else screen height.
     :param baseDim: BASE_WIDTH or BASE_HEIGHT, matching currDim.
     """
+    scale = currDim / baseDim
+
     # Shrink attributes with window width to top left of screen.
     for attr in data.generalAttrs:
-        xSize = currDim / (baseDim / ART_SIZES[attr][0]) if ART_SIZES[attr][0] != 0 else 0
-        ySize = currDim / (baseDim / ART_SIZES[attr][1]) if ART_SIZES[attr][1] != 0 else 0
+        xSize = ART_SIZES[attr][0] * scale
+        ySize = ART_SIZES[attr][1] * scale
 
         # xPos absolute if not in floatRightAttrs, else xPos for attr floats right.
-        xPos = screenWidth - xSize if attr in data.floatRightAttrs else currDim / (baseDim / ART_POS[attr][0]) if ART_POS[attr][0] != 0 else 0
-        yPos = currDim / (baseDim / ART_POS[attr][1]) if ART_POS[attr][1] != 0 else 0
+        xPos = screenWidth - xSize if attr in data.floatRightAttrs else ART_POS[attr][0] * scale
+        yPos = ART_POS[attr][1] * scale
 
         setattr(Artifacts, attr + "Size", (xSize, ySize))
         setattr(Artifacts, attr + "Pos", (xPos, yPos))
 
 
+def resize_dest_coords() -> None:
+    """ Recompute the pixel coordinates of every tile on the board for the current tile size.
+        Index 0 (A1) is drawn in the bottom left corner.
+    """
+    tileWidth, tileHeight = Artifacts.fromTileSize
+    Artifacts.destCoords = [(j * tileWidth, (7 - i) * tileHeight) for i in range(8) for j in range(8)]
+
+
 def resize_settings_bttns(currDim, baseDim) -> None:
     """ Resize all of the buttons within the settings menu.
 
@@ -266,18 +321,77 @@ def resize_settings_bttns(currDim, baseDim) -> None:
     :param baseDim: BASE_WIDTH or BASE_HEIGHT, matching currDim.
     """
     # Settings buttons attributes
-    
+    scale = currDim / baseDim
+
     for attr in data.bttnsAttrs:
-        size = [(currDim / (baseDim / ART_SIZES[attr][i][0]), currDim /
-                  (baseDim / ART_SIZES[attr][i][1])) for i in range(len(ART_SIZES[attr]))]
-        
-        pos = [(currDim / (baseDim / ART_POS[attr][i][0]), currDim /
-                 (baseDim / ART_POS[attr][i][1])) for i in range(len(ART_POS[attr]))]
+        size = [(xSize * scale, ySize * scale) for xSize, ySize in ART_SIZES[attr]]
+        pos = [(xPos * scale, yPos * scale) for xPos, yPos in ART_POS[attr]]
 
         setattr(Artifacts, attr + "Size", size)
         setattr(Artifacts, attr + "Pos", pos)
 
 
+def resize_settings_rects() -> None:
+    """ Pre-fill a surface for each rect of the settings menu, so the menu is drawn with blits alone.
+        Each resolution button also gets a highlighted variant for when it is selected.
+    """
+    surfs = Artifacts.settingsRectSurfs
+
+    for i, size in enumerate(Artifacts.resSize):
+        colour = data.COLOUR_BONE_RED if i % 2 == 0 else data.COLOUR_LIGHT_TAUPE
+        surfs["res", i, False] = filled_surface(size, colour)
+        surfs["res", i, True] = filled_surface(size, data.COLOUR_CLOUDY_BLUE)
+
+    surfs["fs", 0] = filled_surface(Artifacts.fsSize[0], data.COLOUR_LIGHT_TAUPE)
+    surfs["fs", 1] = filled_surface(Artifacts.fsSize[1], data.COLOUR_BONE_RED)
+
+    # The save button is only an outline, drawn onto a transparent surface.
+    save = pygame.Surface((int(Artifacts.saveSize[0]), int(Artifacts.saveSize[1])), pygame.SRCALPHA)
+    pygame.draw.rect(save, data.COLOUR_BONE_RED, save.get_rect(), width = 3)
+    surfs["save"] = save.convert_alpha()
+
+
+def filled_surface(size: Tuple[float, float], colour: Tuple[int, int, int]) -> pygame.Surface:
+    """ Create a surface of a size filled with a single colour.
+
+    :param size: The (width, height) of the surface, truncated to whole pixels.
+    :param colour: The colour to fill the surface with.
+    :returns: The filled surface, in the display's pixel format.
+    """
+    surface = pygame.Surface((int(size[0]), int(size[1]))).convert()
+    surface.fill(colour)
+
+    return surface
+
+
+def click_rect(pos: Tuple[float, float], size: Tuple[float, float]) -> pygame.Rect:
+    """ Build the rect holding every pixel inside pos <= point <= pos + size, edges included.
+        Positions and sizes are floats at most scales, so the edges are rounded inward rather than truncated.
+
+    :param pos: The (x, y) position of the artifact.
+    :param size: The (width, height) of the artifact.
+    :returns: The rect to hit test clicks against.
+    """
+    left, top = math.ceil(pos[0]), math.ceil(pos[1])
+    right, bottom = math.floor(pos[0] + size[0]), math.floor(pos[1] + size[1])
+
+    # collidepoint excludes the right and bottom edges, so the rect extends one pixel past them.
+    return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+
+def update_rects() -> None:
+    """ Recompute the rects of the clickable artifacts from their current size and position.
+    """
+    for attr in data.clickableAttrs:
+        size = getattr(Artifacts, attr + "Size")
+        pos = getattr(Artifacts, attr + "Pos")
+
+        if attr in data.bttnsAttrs:
+            Artifacts.rects[attr] = [click_rect(pos[i], size[i]) for i in range(len(size))]
+        else:
+            Artifacts.rects[attr] = click_rect(pos, size)
+
+
 def text_resize(screenWidth, screenHeight, currDim, baseDim) -> None:
     """ Resize the text relative the min of screenWidth, screenHeight.
         Called whenever there is a window resize.
@@ -289,29 +403,56 @@ def text_resize(screenWidth, screenHeight, currDim, baseDim) -> None:
     """
     ratio = min(screenWidth / BASE_WIDTH, screenHeight / BASE_HEIGHT)
 
-    # Update font sizes
+    # Update font sizes, only loading a font from disk for a size not seen before.
     for attr in data.fontAttrs:
-        setattr(Artifacts, attr + "Font", pygame.font.Font(data.COURIER_FONT, size = int(ART_SIZES[attr] * ratio)))
+        fontKey = (attr, int(ART_SIZES[attr] * ratio))
+        font = Artifacts.fontCache.get(fontKey)
+
+        if font is None:
+            font = pygame.font.Font(data.COURIER_FONT, size = fontKey[1])
+            Artifacts.fontCache[fontKey] = font
+
+        setattr(Artifacts, attr + "Font", font)
+
+    # Text only needs rendering again once the font has changed.
+    Artifacts.pgnWordCache.clear()
+    Artifacts.pgnHeaderSurface = Artifacts.pgnHeaderFont.render("PGN:", False, data.COLOUR_BLACK).convert_alpha()
+
+    # The turn indicator and settings labels come from a fixed set of strings, render each once per font.
+    textFonts = {"WHITE": Artifacts.turnTextFont, "BLACK": Artifacts.turnTextFont, "SAVE": Artifacts.saveTextFont,
+                 "FULLSCREEN": Artifacts.fsTextFont, "ON": Artifacts.fsTextFont, "OFF": Artifacts.fsTextFont}
+    textFonts.update((res, Artifacts.fsTextFont) for res in data.res)
+
+    Artifacts.textCache = {text: font.render(text, False, data.COLOUR_BLACK).convert_alpha() for text, font in textFonts.items()}
 
     # Update pgn text positions
+    scale = currDim / baseDim
+
     for attr in data.pgnAttrs:
-        pos = (currDim / (baseDim / ART_POS[attr][0]), currDim / (baseDim / ART_POS[attr][1]))
+        pos = (ART_POS[attr][0] * scale, ART_POS[attr][1] * scale)
         setattr(Artifacts, attr + "Pos", pos)
 
 
-def update_pieces(gameBoard: board.Board()) -> None:
-    """ Updates the scaling of the pieces images and restores their values.
+def update_pieces() -> None:
+    """ Scale every piece image to the tile size and pack them into one atlas, each piece image being
+        a subsurface of it so every piece blit shares a single source surface.
         Called whenever there is a window resize.
-
-    :param gameBoard: The board object including information for each successive turn.
     """
-    for i in range(8):
-        for j in range(8):
-            sq = data.file_rank_to_index(i * 8 + j)
-            piece = gameBoard.pieces[sq]
+    tileWidth, tileHeight = int(Artifacts.fromTileSize[0]), int(Artifacts.fromTileSize[1])
+    scaledImgs = Artifacts.scaledImgs
+
+    # White pieces on the top row, black pieces on the bottom row, in piece order.
+    atlas = pygame.Surface((6 * tileWidth, 2 * tileHeight), pygame.SRCALPHA).convert_alpha()
+    atlas.fill((0, 0, 0, 0))
 
-            if piece != enums.Piece.EMPTY.value:
-                Artifacts.scaledImgs[str(piece)] = pygame.transform.scale(Artifacts.imgs[str(piece)], Artifacts.fromTileSize)
+    for piece in range(enums.Piece.wP.value, enums.Piece.bK.value + 1):
+        area = pygame.Rect((piece - 1) % 6 * tileWidth, (piece - 1) // 6 * tileHeight, tileWidth, tileHeight)
+
+        # Max blending onto the transparent atlas copies the pixels, alpha included, instead of alpha blending them.
+        atlas.blit(scale_img(str(piece), (tileWidth, tileHeight)), area, special_flags = pygame.BLEND_RGBA_MAX)
+        scaledImgs[str(piece)] = atlas.subsurface(area)
+
+    Artifacts.pieceAtlas = atlas
 
 
 def update_imgs() -> None:
@@ -319,28 +460,44 @@ def update_imgs() -> None:
         Called whenever there is a window resize.
     """
     for key in data.nonPceImgs:
-        Artifacts.scaledImgs[key] = pygame.transform.scale(Artifacts.imgs[key], getattr(Artifacts, key + "Size"))
+        Artifacts.scaledImgs[key] = scale_img(key, getattr(Artifacts, key + "Size"))
+
+
+def scale_img(key: str, size: Tuple[int, int]) -> pygame.Surface:
+    """ Scale an image to a size, reusing the surface if it was already scaled to that size.
+        Once the cache is full the oldest scaled image is evicted.
+
+    :param key: The key of the image in Artifacts.imgs.
+    :param size: The (width, height) to scale the image to.
+    :returns: The scaled image surface.
+    """
+    cacheKey = (key, (int(size[0]), int(size[1])))
+    scaled = Artifacts.scaleCache.get(cacheKey)
+
+    if scaled is None:
+        scaled = pygame.transform.smoothscale(Artifacts.imgs[key], cacheKey[1])
+
+        if len(Artifacts.scaleCache) >= SCALE_CACHE_SIZE:
+            del Artifacts.scaleCache[next(iter(Artifacts.scaleCache))]
 
+        Artifacts.scaleCache[cacheKey] = scaled
 
-def is_clicked(artifact: str, mousePos: Tuple[int, int], index: int = False) -> bool:
+    return scaled
+
+
+def is_clicked(artifact: str, mousePos: Tuple[int, int], index: int = None) -> bool:
     """ Returns true if the artifact is clicked, False otherwise.
 
     :param artifact: A string representing the given artifact, used for key indexing.
-    :param index: An integer representing an index. False by default, for artifacts that are not list like.
+    :param index: An integer representing an index. None by default, for artifacts that are not list like.
     :returns: A boolean determining if an artifact was clicked by the mouse.
     """
-    if index:
-        tempSize = getattr(Artifacts, artifact + "Size")[index]
-        tempPos = getattr(Artifacts, artifact + "Pos")[index]
-    
-    else:
-        tempSize = getattr(Artifacts, artifact + "Size")
-        tempPos = getattr(Artifacts, artifact + "Pos")
+    rect = Artifacts.rects[artifact]
 
-    if tempPos[0] <= mousePos[0] <= tempPos[0] + tempSize[0] and tempPos[1] <= mousePos[1] <= tempPos[1] + tempSize[1]:
-        return True
-    
-    return False
+    if index is not None:
+        rect = rect[index]
+
+    return bool(rect.collidepoint(mousePos))
 
 
 def is_clicked_prom(promPos: Tuple[int, int], mousePos: Tuple[int, int], prom: int) -> int:
@@ -353,18 +510,15 @@ def is_clicked_prom(promPos: Tuple[int, int], mousePos: Tuple[int, int], prom: i
 
     :returns: The promoted piece, or a false int (`0`) if not selected.
     """
+    tileWidth, tileHeight = Artifacts.fromTileSize
+
     # If the horizontal position of the mouse click is within the promotion menu.
-    if promPos[0] < mousePos[0] < promPos[0] + Artifacts.fromTileSize[0]:
+    if promPos[0] < mousePos[0] < promPos[0] + tileWidth:
         # The position within the promotion menu: which piece is selected. Works for both sides.
-        index = int((mousePos[1] - promPos[1]) / Artifacts.fromTileSize[0] // 1)
+        index = int((mousePos[1] - promPos[1]) // tileHeight)
 
         if 0 <= index <= 3:
-            if prom == 1:
-                promPiece = data.whitePromPieces[index].value
-            else:
-                promPiece = data.blackPromPieces[index].value
-
-            return promPiece
+            return data.promPieces[prom][index].value
         
     return 0
 
@@ -376,16 +530,32 @@ def set_prom_pos(gameBoard: board.Board(), to120: int, prom: int) -> None:
     :param to120: The 120sq index representing where a piece is moving to.
     :param prom: A tertiary value representing (no, white, black) -> (0, 1, 2) promotion.
     """
+    tileWidth, tileHeight = Artifacts.fromTileSize
     index = gameBoard.map120To64[to120]
 
     rank = index // 8
     file = (index / 8 - rank) * 8
 
     if prom == 1: # White
-        Artifacts.promPos = (file * Artifacts.fromTileSize[0], (7 - rank) * Artifacts.fromTileSize[1])
+        Artifacts.promPos = (file * tileWidth, (7 - rank) * tileHeight)
 
     elif prom == 2: # Black
-        Artifacts.promPos = (file * Artifacts.fromTileSize[0], ((7 - rank) * Artifacts.fromTileSize[1]) - Artifacts.fromTileSize[1] * 3)
+        Artifacts.promPos = (file * tileWidth, ((7 - rank) * tileHeight) - tileHeight * 3)
+
+    Artifacts.promSide = prom
+    set_prom_blits()
+
+
+def set_prom_blits() -> None:
+    """ Pair each promotion menu piece image with its position, stacked down from the promotion menu's position.
+        Recomputed whenever the menu moves or the piece images are rescaled.
+    """
+    promX, promY = Artifacts.promPos
+    tileHeight = Artifacts.fromTileSize[1]
+    scaledImgs = Artifacts.scaledImgs
+
+    Artifacts.promBlits = [(scaledImgs[str(piece.value)], (promX, promY + tileHeight * index))
+                           for index, piece in enumerate(data.promPieces[Artifacts.promSide])]
 
 
 def set_from_tile(gameBoard: board.Board(), from120: int) -> None:
@@ -394,27 +564,23 @@ def set_from_tile(gameBoard: board.Board(), from120: int) -> None:
     :param gameBoard: The board object including information for each successive turn.
     :param from120: The 120sq index representing where to draw previous position.
     """
+    tileWidth, tileHeight = Artifacts.fromTileSize
     index = gameBoard.map120To64[from120]
 
     rank = index // 8
     file = (index / 8 - rank) * 8
 
-    Artifacts.fromTilePos = (file * Artifacts.fromTileSize[0], (7 - rank) * Artifacts.fromTileSize[1])
+    Artifacts.fromTilePos = (file * tileWidth, (7 - rank) * tileHeight)
 
 
 def set_piece_imgs_positions(gameBoard: board.Board()) -> None:
-    """ Map the scaled piece images to their respective position on the board.
+    """ Pair the scaled image of every piece on the board with its position, ready to blit.
 
     :param gameBoard: The board object including information for each successive turn.
     """
-    for i in range(8):
-        for j in range(8):
-            sq = data.file_rank_to_index(i * 8 + j)
-            piece = gameBoard.pieces[sq]
+    scaledImgs = Artifacts.scaledImgs
+    destCoords = Artifacts.destCoords
+    pieces = gameBoard.pieces[gameBoard.map64To120].tolist()
 
-            if piece != enums.Piece.EMPTY.value:
-                dest = (j * Artifacts.fromTileSize[0], (7 - i) * Artifacts.fromTileSize[1])
-                Artifacts.pieceImgsPos[sq] = (Artifacts.scaledImgs[str(piece)], dest)
-
-            else:
-                Artifacts.pieceImgsPos.pop(sq, None)
\ No newline at end of file
+    Artifacts.pieceBlits = [(scaledImgs[str(piece)], destCoords[sq64])
+                            for sq64, piece in enumerate(pieces) if piece != enums.Piece.EMPTY.value]
@@ -5,73 +5,293 @@
 :version: v1.0.0
 """
 import board
+import bitboards
 import data
 import enums
 
+# Mask to keep shifted bitboards within 64 bits.
+FULL_BOARD = bitboards.FULL_BOARD
+
+# File masks used to stop shifted bitboards from wrapping around the edge of the board.
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+NOT_FILE_A = ~FILE_A & FULL_BOARD
+NOT_FILE_H = ~FILE_H & FULL_BOARD
+NOT_FILE_AB = ~(FILE_A | FILE_A << 1) & FULL_BOARD
+NOT_FILE_GH = ~(FILE_H | FILE_H >> 1) & FULL_BOARD
+
+# (shift, wrap mask) for each sliding direction. Positive shifts move up the board.
+BISHOP_SHIFTS = [(9, NOT_FILE_A), (7, NOT_FILE_H), (-7, NOT_FILE_A), (-9, NOT_FILE_H)]
+ROOK_SHIFTS = [(8, FULL_BOARD), (1, NOT_FILE_A), (-8, FULL_BOARD), (-1, NOT_FILE_H)]
+
+# Attack bitboards for the leaping pieces, indexed by 64sq.
+KNIGHT_ATTACKS = [0] * 64
+KING_ATTACKS = [0] * 64
+# Squares attacked by a pawn of the given colour, indexed by [colour][64sq].
+PAWN_ATTACKS = [[0] * 64, [0] * 64]
+
+# Rays from a 64sq to the edge of the board (excluding the square itself), indexed by [120sq direction][64sq].
+RAYS = {direction: [0] * 64 for direction in data.KingDirection}
+
+
+def step_mask(sq120: int, directions: list) -> int:
+    """ Build a bitboard of the squares one step away from a 120sq in each direction.
+
+    :param sq120: The 120sq index to step from.
+    :param directions: The 120sq offsets to step by.
+    :returns: A bitboard of every on board square reached.
+    """
+    mask = 0
+    for direction in directions:
+        tile = sq120 + direction
+
+        if data.FilesBrd[tile] != enums.Tiles.OFF_BOARD.value:
+            mask |= 1 << bitboards.square120ToSquare64[tile]
+
+    return mask
+
+
+def ray_mask(sq120: int, directions: list) -> int:
+    """ Build a bitboard of every square from a 120sq to the edge of the board in each direction.
+
+    :param sq120: The 120sq index to slide from.
+    :param directions: The 120sq offsets to slide by.
+    :returns: A bitboard of every on board square reached.
+    """
+    mask = 0
+    for direction in directions:
+        tile = sq120 + direction
+
+        while data.FilesBrd[tile] != enums.Tiles.OFF_BOARD.value:
+            mask |= 1 << bitboards.square120ToSquare64[tile]
+            tile += direction
+
+    return mask
+
+
+def init_attack_tables() -> None:
+    """ Initialize the precomputed attack bitboards for every 64sq.
+        Walks the 120sq board once, so each attack query is reduced to a table lookup.
+    """
+    for sq64 in range(64):
+        sq120 = bitboards.square64ToSquare120[sq64]
+
+        KNIGHT_ATTACKS[sq64] = step_mask(sq120, data.KnightDirection)
+        KING_ATTACKS[sq64] = step_mask(sq120, data.KingDirection)
+        PAWN_ATTACKS[enums.Turn.WHITE.value][sq64] = step_mask(sq120, [9, 11])
+        PAWN_ATTACKS[enums.Turn.BLACK.value][sq64] = step_mask(sq120, [-9, -11])
+
+        for direction in data.KingDirection:
+            RAYS[direction][sq64] = ray_mask(sq120, [direction])
+
+
+def first_blocker(sq64: int, occupancy: int, direction: int) -> int:
+    """ Find the first piece hit when sliding from a 64sq in a direction.
+
+    :param sq64: The 64sq to slide from.
+    :param occupancy: The bitboard of every piece on the board.
+    :param direction: The 120sq offset to slide by.
+    :returns: A bitboard with only the blocking piece set, 0 if the ray is empty.
+    """
+    blockers = occupancy & RAYS[direction][sq64]
+
+    # Positive directions move up the board, so the nearest blocker is the lowest bit.
+    if direction > 0:
+        return blockers & -blockers
+
+    # Negative directions move down the board, so the nearest blocker is the highest bit.
+    return 1 << (blockers.bit_length() - 1) if blockers else 0
+
+
+def _is_attacked_by_white(sq64: int, board: board.Board) -> bool:
+    """ Return whether a 64sq is attacked by a white piece.
+
+    :param sq64: The 64sq index to check.
+    :param board: The game board object including information for each successive turn.
+    :returns: A boolean representing if the square is attacked.
+    """
+    pawns, knights, bishops, rooks, queens, king = board.pceBitboards[enums.Piece.wP.value:enums.Piece.bP.value]
+
+    # A black pawn on this square attacks exactly the squares a white pawn attacks it from.
+    if PAWN_ATTACKS[enums.Turn.BLACK.value][sq64] & pawns or KNIGHT_ATTACKS[sq64] & knights or KING_ATTACKS[sq64] & king:
+        return True
+
+    occupancy = board.occupancy[enums.Turn.BOTH.value]
+    diagonalSliders = bishops | queens
+    straightSliders = rooks | queens
+
+    for direction in data.BishopDirection:
+        if first_blocker(sq64, occupancy, direction) & diagonalSliders:
+            return True
+
+    for direction in data.RookDirection:
+        if first_blocker(sq64, occupancy, direction) & straightSliders:
+            return True
+
+    return False
+
+
+def _is_attacked_by_black(sq64: int, board: board.Board) -> bool:
+    """ Return whether a 64sq is attacked by a black piece.
+
+    :param sq64: The 64sq index to check.
+    :param board: The game board object including information for each successive turn.
+    :returns: A boolean representing if the square is attacked.
+    """
+    pawns, knights, bishops, rooks, queens, king = board.pceBitboards[enums.Piece.bP.value:]
+
+    # A white pawn on this square attacks exactly the squares a black pawn attacks it from.
+    if PAWN_ATTACKS[enums.Turn.WHITE.value][sq64] & pawns or KNIGHT_ATTACKS[sq64] & knights or KING_ATTACKS[sq64] & king:
+        return True
+
+    occupancy = board.occupancy[enums.Turn.BOTH.value]
+    diagonalSliders = bishops | queens
+    straightSliders = rooks | queens
+
+    for direction in data.BishopDirection:
+        if first_blocker(sq64, occupancy, direction) & diagonalSliders:
+            return True
+
+    for direction in data.RookDirection:
+        if first_blocker(sq64, occupancy, direction) & straightSliders:
+            return True
+
+    return False
+
+
 def is_attacked(square: int, board: board.Board) -> bool:
     """ Given a 120sq index, return whether it is attacked or not by an opposing piece.
         Important to determine king moves as well as castling permissions.
-    
+
     :param square: The 120sq index to check.
     :param gameBoard: The game board object including information for each successive turn.
     :returns: A boolean representing if the square is attacked.
     """
-
-    # As noted in enums.Piece, each black piece value corresponds to a white piece value incremented by 6.
-    # This modifier is used to reduce the number of lines of code if it is white to play.
     # If white to play, look for black pieces attacking the square.
-    modifier = 0
     if board.turn == enums.Turn.WHITE.value:
-        modifier = 6
+        return _is_attacked_by_black(bitboards.square120ToSquare64[square], board)
 
-    if board.turn == enums.Turn.WHITE.value:
-        if board.pieces[square + 9] == enums.Piece.bP.value or board.pieces[square + 11] == enums.Piece.bP.value:
-            return "Black Pawn Threat"
-    
-    else:
-        if board.pieces[square - 9] == enums.Piece.wP.value or board.pieces[square - 11] == enums.Piece.wP.value:
-            return "White Pawn Threat"
-    
-    for direction in data.KnightDirection:
-        if board.pieces[square + direction] == (enums.Piece.wN.value + modifier):
-            return "Knight Threat"
-    
-    for direction in data.BishopDirection:
-        tile = square + direction
-        piece = board.pieces[tile]
+    return _is_attacked_by_white(bitboards.square120ToSquare64[square], board)
 
-        while piece == enums.Piece.EMPTY.value:
-            if piece == (enums.Piece.wB.value + modifier):
-                return "Bishop Threat"
 
-            tile += direction
-            piece = board.pieces[tile]
+def pawn_attacks_bb(pawns: int, side: int) -> int:
+    """ The squares attacked by every pawn of a side at once.
 
-    for direction in data.RookDirection:
-        tile = square + direction
-        piece = board.pieces[tile]
+    :param pawns: The bitboard of the side's pawns.
+    :param side: The colour of the pawns, as in enums.Turn.
+    :returns: A bitboard of the attacked squares.
+    """
+    if side == enums.Turn.WHITE.value:
+        return ((pawns << 7) & NOT_FILE_H | (pawns << 9) & NOT_FILE_A) & FULL_BOARD
 
-        while piece == enums.Piece.EMPTY.value:
-            if piece == (enums.Piece.wR.value + modifier):
-                return "Rook Threat"
-            
-            tile += direction
-            piece = board.pieces[tile]
-
-    for direction in data.BishopDirection + data.RookDirection:
-        if board.pieces[square + direction] == (enums.Piece.wK.value + modifier):
-            return "King Threat"
-        
-    for direction in data.BishopDirection + data.RookDirection:
-        tile = square + direction
-        piece = board.pieces[tile]
-
-        # while piece != enums.Tiles.OFF_BOARD.value:
-        while piece == enums.Piece.EMPTY.value:
-            if piece == (enums.Piece.wQ.value + modifier):
-                return "Queen Threat"
-            
-            tile += direction
-            piece = board.pieces[tile]
+    return (pawns >> 9) & NOT_FILE_H | (pawns >> 7) & NOT_FILE_A
+
+
+def knight_attacks_bb(knights: int) -> int:
+    """ The squares attacked by every knight in a bitboard at once.
+
+    :param knights: The bitboard of knights.
+    :returns: A bitboard of the attacked squares.
+    """
+    oneFile = (knights >> 1) & NOT_FILE_H | (knights << 1) & NOT_FILE_A
+    twoFiles = (knights >> 2) & NOT_FILE_GH | (knights << 2) & NOT_FILE_AB
+
+    return (oneFile << 16 | oneFile >> 16 | twoFiles << 8 | twoFiles >> 8) & FULL_BOARD
+
+
+def king_attacks_bb(kings: int) -> int:
+    """ The squares attacked by every king in a bitboard at once.
+
+    :param kings: The bitboard of kings.
+    :returns: A bitboard of the attacked squares.
+    """
+    attacks = (kings << 1) & NOT_FILE_A | (kings >> 1) & NOT_FILE_H
+    kings |= attacks
+
+    return (attacks | kings << 8 | kings >> 8) & FULL_BOARD
+
+
+def occluded_fill(sliders: int, empty: int, shift: int, wrap: int) -> int:
+    """ Kogge-Stone fill: slide every piece in a bitboard one direction until blocked.
+
+    :param sliders: The bitboard of sliding pieces.
+    :param empty: The bitboard of empty squares.
+    :param shift: The bit shift of one step, positive moving up the board.
+    :param wrap: The mask of squares a step can land on without wrapping around the board.
+    :returns: A bitboard of the attacked squares in that direction, including the first blocker.
+    """
+    empty &= wrap
+
+    if shift > 0:
+        sliders |= empty & (sliders << shift)
+        empty &= empty << shift
+        sliders |= empty & (sliders << 2 * shift)
+        empty &= empty << 2 * shift
+        sliders |= empty & (sliders << 4 * shift)
+
+        return (sliders << shift) & wrap & FULL_BOARD
+
+    shift = -shift
+    sliders |= empty & (sliders >> shift)
+    empty &= empty >> shift
+    sliders |= empty & (sliders >> 2 * shift)
+    empty &= empty >> 2 * shift
+    sliders |= empty & (sliders >> 4 * shift)
+
+    return (sliders >> shift) & wrap
+
+
+def slider_attacks_bb(sliders: int, occupancy: int, diagonal: bool) -> int:
+    """ The squares attacked by every sliding piece in a bitboard at once.
+
+    :param sliders: The bitboard of sliding pieces.
+    :param occupancy: The bitboard of every piece on the board.
+    :param diagonal: True to slide like a bishop, False to slide like a rook.
+    :returns: A bitboard of the attacked squares.
+    """
+    # No sliders left on the board, skip the four fills.
+    if not sliders:
+        return 0
+
+    empty = ~occupancy & FULL_BOARD
+    attacks = 0
+
+    for shift, wrap in (BISHOP_SHIFTS if diagonal else ROOK_SHIFTS):
+        attacks |= occluded_fill(sliders, empty, shift, wrap)
+
+    return attacks
+
+
+def attacked_bb(board: board.Board, bySide: int) -> int:
+    """ Generate every square attacked by a side in a single pass over its piece bitboards.
+
+    :param board: The game board object including information for each successive turn.
+    :param bySide: The attacking colour, as in enums.Turn.
+    :returns: A 64sq bitboard of the attacked squares.
+    """
+    # Black piece values are the white piece values incremented by 6.
+    modifier = 0 if bySide == enums.Turn.WHITE.value else 6
+    pceBitboards = board.pceBitboards
+    occupancy = board.occupancy[enums.Turn.BOTH.value]
+
+    queens = pceBitboards[enums.Piece.wQ.value + modifier]
+    diagonalSliders = pceBitboards[enums.Piece.wB.value + modifier] | queens
+    straightSliders = pceBitboards[enums.Piece.wR.value + modifier] | queens
+
+    return (pawn_attacks_bb(pceBitboards[enums.Piece.wP.value + modifier], bySide)
+             | knight_attacks_bb(pceBitboards[enums.Piece.wN.value + modifier])
+             | king_attacks_bb(pceBitboards[enums.Piece.wK.value + modifier])
+             | slider_attacks_bb(diagonalSliders, occupancy, True)
+             | slider_attacks_bb(straightSliders, occupancy, False))
+
+
+def get_attacked_bitboard(board: board.Board) -> int:
+    """ Return the bitboard of every square attacked by an opposing piece.
+
+    :param board: The game board object including information for each successive turn.
+    :returns: A 64sq bitboard of the attacked squares.
+    """
+    return attacked_bb(board, int(not board.turn))
 
-    return False
\ No newline at end of file
+# INITIALIZE
+init_attack_tables()
@@ -10,49 +10,50 @@ import board
 import enums
 import data
 
-from ctypes import c_ulonglong as ull
-from ctypes import c_uint as uint
 import ctypes
 
 from typing import Tuple, Union
 
 
 
-square120ToSquare64 = (ull * 120)()
-square64ToSquare120 = (ull * 64)()
+# Mask of every square, keeps shifted and inverted bitboards within 64 bits.
+FULL_BOARD = 0xFFFFFFFFFFFFFFFF
 
-setMask = (ull * 64)()
-clearMask = (ull * 64)()
+# Board maps and bitmasks, frozen into tuples of ints by the init functions below.
+square120ToSquare64 = ()
+square64ToSquare120 = ()
+
+setMask = ()
+clearMask = ()
 
 def init_bitmasks() -> None:
     """ Initialize the bitmasks that are used to set and clear bits.
-        clearMask is the inverse of setMask.
+        clearMask is the inverse of setMask, kept within 64 bits.
     """
-    for i in range(64):
-        setMask[i] |= ull(1 << i).value
-        clearMask[i] = ~setMask[i]
+    global setMask, clearMask
+
+    setMask = tuple(1 << i for i in range(64))
+    clearMask = tuple(~mask & FULL_BOARD for mask in setMask)
 
 
-def set_bit(bitboard: ull, sq: int) -> ull:
+def set_bit(bitboard: int, sq: int) -> int:
     """ Set a bitboard bit given a 120sq.
     
     :param bitboard: The bitboard containing piece location information.
     :param sq: The 64sq to set.
     :returns: The bitboard with the set bit.
     """
-    bitboard.value |= int(setMask[sq])
-    return bitboard
+    return bitboard | setMask[sq]
 
 
-def clear_bit(bitboard: ull, sq: int):
+def clear_bit(bitboard: int, sq: int) -> int:
     """ Clear a bitboard bit given a 120sq.
     
     :param bitboard: The bitboard to store.
     :param sq: The 64sq to set.
     :returns: The bitboard with the removed bit.
     """
-    bitboard.value &= clearMask[sq]
-    return bitboard
+    return bitboard & clearMask[sq]
 
 
 def init_sq_arrs() -> None:
@@ -98,17 +99,14 @@ def init_sq_arrs() -> None:
         FILE  A    B    C    D    E    F    G    H
                                 Black
     """
-    sq = 21
-    sq64 = 0
-    for i in range (8): # Iterate up each file. (Board is printed flipped on horizontal axis.)
-        for j in range(8): # Iterate across each rank.
-            sq = data.file_rank_to_index(i * 8 + j)
-            square64ToSquare120[sq64] = sq
-            square120ToSquare64[sq] = sq64
-            sq64 += 1
+    global square120ToSquare64, square64ToSquare120
+
+    # Tuples of plain ints copied from the data.py maps, so single square lookups skip NumPy scalars.
+    square120ToSquare64 = tuple(data.Sq120To64.tolist())
+    square64ToSquare120 = tuple(data.Sq64To120.tolist())
 
 
-def print_bitboard(bitboard: ull) -> None:
+def print_bitboard(bitboard: int) -> None:
     """ Prints the current bitboard positions to the console.
     
         Sample:
@@ -122,18 +120,11 @@ def print_bitboard(bitboard: ull) -> None:
         - - - - - - - - 1
         A B C D E F G H
 
-    :param bitboard: The Unsigned 64 bit integer bitboard.
+    :param bitboard: The 64 bit integer bitboard.
     """
-    shiftMe = ull(1) # Unsigned 64 bit int to be shifted.
-    sq = ull(0) # 120sq index.
-    sq64 = ull(0) # sq64 value to bitshift.
-
     for i in range(7, -1, -1): # Loop from top to bottom.
         for j in range(8): # Loop left to right.
-            sq = data.file_rank_to_index(i * 8 + j)
-            sq64 = square120ToSquare64[sq]
-
-            if ((shiftMe.value << sq64) & bitboard.value):
+            if bitboard & setMask[i * 8 + j]:
                 print("X", end = " ")
             else:
                 print("-", end = " ")
@@ -142,31 +133,25 @@ def print_bitboard(bitboard: ull) -> None:
     print("A B C D E F G H")
 
 
-def pop_bit(bitboard: ull) -> Tuple[int, ull] :
-    """ Used to pop the most recent bit off of a bitboard. Used when undoing moves on the board.
+def pop_bit(bitboard: int) -> Tuple[int, int] :
+    """ Pop the least significant bit off of a bitboard, using int.bit_length rather than a De Bruijn table lookup.
 
     :param bitboard: The bitboard containing piece location information.
     :returns: A tuple containing the 64sq index and the bitboard.
     """
-    b = ull(bitboard.value ^ (bitboard.value - 1))
-    fold = uint((b.value & 0xffffffff) ^ (b.value >> 32))
-    bitboard = ull(bitboard.value & (bitboard.value - 1))
+    # Isolate the least significant bit, its length is one past its index.
+    lsb = bitboard & -bitboard
 
-    return data.BitTable[uint(uint(fold.value * 0x783a9b23).value >> 26).value], bitboard 
+    return lsb.bit_length() - 1, bitboard ^ lsb
 
 
-def CountBits(bitboard: ull) -> int:
+def CountBits(bitboard: int) -> int:
     """ Counts the number of bits in a bitboard, and returns them as an integer.
 
     :param bitboard: The bitboard to count the number of pieces contained.
     :returns: The number of pieces stored in the bitboard.
     """
-    count = 0
-    while bitboard.value:
-        count += 1
-        bitboard.value &= bitboard.value - 1
-
-    return count
+    return bitboard.bit_count()
 
 
 def print_bin(num: Union[int, ctypes.c_ulonglong], binaryDigits = 64) -> None:
@@ -176,33 +161,14 @@ def print_bin(num: Union[int, ctypes.c_ulonglong], binaryDigits = 64) -> None:
     :param num: The decimal based number to be printed in binary.
     :param binaryDigits: The number of digits to include in the output. 64 default.
     """
-    if isinstance(num, int):
-        num = ull(num)
-        
-    denominator = ull(2 ** (binaryDigits - 1))
-
-    def recursive(a):
-        if a.value == ull(1).value:
-            return True
-        elif a.value < ull(1).value:
-            return False
-        else:
-            return recursive(ull(int(a.value / 16)))
-
-    while denominator.value >= ull(1).value:
-
-        if num.value >= denominator.value:
-            print('1', end = "")
-        else:
-            print('0', end = "")
-
-        if recursive(denominator):
-            print(" ", end = "")
+    if not isinstance(num, int):
+        num = num.value
 
-        num = ull(num.value % denominator.value)
-        denominator = ull(int(denominator.value / 2))
+    bits = format(num & ((1 << binaryDigits) - 1), "0" + str(binaryDigits) + "b")
 
-    print("")
+    # Group into nibbles from the least significant digit.
+    first = binaryDigits % 4 or 4
+    print(" ".join([bits[:first]] + [bits[k:k + 4] for k in range(first, binaryDigits, 4)]))
 
 
 def print_undo_object(undo: board.Undo()) -> None:
@@ -8,63 +8,132 @@ import enums
 import data
 import bitboards
 import hashkeys
-from ctypes import c_ulonglong as ull, c_uint as uint
+import numpy as np
+import functools
+from typing import Tuple
+
+# The starting position every new board is copied from, built by the first board created.
+_TEMPLATE = None
+
+# Size of the preallocated history arrays.
+MAX_GAME_PLIES = 2048
 
 # FEN to load the pieces onto the board.
 STARTING_POS_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
 
+# Enum values bound once, so the hot paths compare plain ints instead of looking up .value on every access.
+EMPTY = enums.Piece.EMPTY.value
+WP = enums.Piece.wP.value
+BP = enums.Piece.bP.value
+WK = enums.Piece.wK.value
+BK = enums.Piece.bK.value
+OFF = enums.Tiles.OFF_BOARD.value
+NOSQ = enums.Tiles.NO_SQUARE.value
+WHITE = enums.Turn.WHITE.value
+BLACK = enums.Turn.BLACK.value
+BOTH = enums.Turn.BOTH.value
+RANK_3 = enums.Rank.RANK_3.value
+RANK_6 = enums.Rank.RANK_6.value
+
+@functools.lru_cache(maxsize = 32)
+def parse_fen(fen: str) -> Tuple[np.ndarray, int, int, int]:
+    """ Parse a FEN into the pieces on each square, the side to play, castle permissions and en passant square.
+        Memoized, as every board parses the same starting position.
+
+    :param fen: The string to parse.
+    :returns: A tuple of (read only piece on each 64sq, side, castle permissions, en passant 120sq).
+    """
+    placement, side, castling, enPassant = fen.split()[:4]
+
+    # FEN lists rank 8 first, reverse the ranks so 64sq 0 is A1, then expand the empty runs to one '.' per square.
+    squares = ''.join(reversed(placement.split('/'))).translate(data.FenExpand)
+    pieces = data.CharToPiece[np.frombuffer(squares.encode('ascii'), dtype = np.uint8)]
+    pieces.flags.writeable = False
+
+    side = WHITE if side == 'w' else BLACK
+
+    # Encoded like the placement field, so a non-ASCII character raises instead of aliasing an ASCII code point.
+    castle = 0
+    for code in castling.encode('ascii'):
+        castle |= data.CastleFen[code]
+
+    if enPassant != '-':
+        file = ord(enPassant[0]) - 97
+        rank = ord(enPassant[1]) - 49
+        enPassant = data.file_rank_to_index(rank * 8 + file)
+
+    else:
+        enPassant = NOSQ
+
+    return pieces, side, castle, enPassant
+
+
 class Board():
     """ Contains all of the data structures for the entire chess match.
     """
     def __init__(self):
-        self.pieces = (ull * 120)()
+        global _TEMPLATE
+
+        # Every board starts from the same position, so the first one is built in full and kept to copy from.
+        if _TEMPLATE is None:
+            _TEMPLATE = Board.__new__(Board)
+            _TEMPLATE.init_start_pos()
+
+        self.copy_from(_TEMPLATE)
 
-        for i in range(120):
-            self.pieces[i] = enums.Tiles.OFF_BOARD.value
 
-        self.turn = enums.Turn.WHITE.value 
+    def init_start_pos(self) -> None:
+        """ Create all of the data structures and load the starting position onto the board.
+        """
+        # Piece index on each 120sq, every tile starts off board until the maps and FEN are loaded.
+        self.pieces = np.full(120, OFF, dtype = np.uint8)
+
+        self.turn = WHITE 
         # Int (4 bits representing all castle positions, start at 1111)
         self.castle = 15 
 
         # Int (Represents an index on the size 120 array for the enPassant square when a pawn was previously moved.)
-        self.enPassant = enums.Tiles.NO_SQUARE.value
+        self.enPassant = NOSQ
         # Int (Represents the number of half moves made in a game since pawn move or piece capture)
         self.fiftyMoveClock = 0 
         # Int (Represents the number of full moves that have been played in the match.)
         self.fullMoves = 0 
 
-        self.kingSquare = (uint * 2)()
+        self.kingSquare = np.zeros(2, dtype = np.int32)
         self.hisply = 0
 
-        self.map64To120 = (ull * 64)()
-        self.map120To64 = (ull * 120)()
-
         # Holds the number of each of the 13 piece types. Index 0 represents NO_PIECE, and indicates empty squares.
-        self.pceNum = (uint * 13)()
+        self.pceNum = np.zeros(13, dtype = np.int32)
         # Holds the number of white big pieces, and black big pieces, respectively.
-        self.bigPce = (uint * 2)()
+        self.bigPce = np.zeros(2, dtype = np.int32)
         # Holds the number of white major pieces, and black major pieces, respectively.
-        self.majPce = (uint * 2)()
+        self.majPce = np.zeros(2, dtype = np.int32)
         # Holds the number of white minor pieces, and black minor pieces, respectively.
-        self.minPce = (uint * 2)()
+        self.minPce = np.zeros(2, dtype = np.int32)
         # Holds the value of white material, and black material, respectively.
-        self.material = (uint * 2)()
+        self.material = np.zeros(2, dtype = np.int32)
 
         # Holds the square (0, 120) of each piece in a 2D array.
-        self.pList = (uint * 10 * 13)()
+        self.pList = np.zeros((13, 10), dtype = np.int32)
+        # Holds the index into pList of the piece on each 120sq.
+        self.pListIndex = np.zeros(120, dtype = np.int32)
+
+        # Holds the pawn bitboards of white and black, respectively. Both is derived by pawns_all.
+        self.pawns = [0] * 2
 
-        self.pawns = [None] * 3
-        for i in range(3):
-            self.pawns[i] = ull(0)
+        # Holds a 64sq bitboard for each of the 13 piece types, indexed by piece.
+        self.pceBitboards = [0] * 13
+        # Holds the bitboard of white pieces, black pieces and both, respectively.
+        self.occupancy = [0] * 3
 
         self.posKey = 0
-        self.history = [None] * 2048
 
-        self.pgnArr = []
-        self.pgn = ""
-
-        self.historyStack = []
-        self.historyStackCounts = []
+        # Holds the information needed to undo each ply, as parallel arrays indexed by hisply.
+        self.histMove = np.zeros(MAX_GAME_PLIES, dtype = np.int32)
+        self.histCastle = np.zeros(MAX_GAME_PLIES, dtype = np.int32)
+        self.histFiftyMoveClock = np.zeros(MAX_GAME_PLIES, dtype = np.int32)
+        self.histEnPassant = np.zeros(MAX_GAME_PLIES, dtype = np.int32)
+        self.histPosKey = np.zeros(MAX_GAME_PLIES, dtype = np.uint64)
 
         # Initialize the board maps
         self.init_board_maps()
@@ -72,11 +141,34 @@ class Board():
         # Initialize the starting position on the board
         self.read_fen(STARTING_POS_FEN)
 
-        # Initially update the materials
+        # Initially update the materials and hash the starting position, moves then update both incrementally.
         self.update_materials()
         self.check_board()
 
 
+    def copy_from(self, other: 'Board') -> None:
+        """ Copy every data structure of another board onto this one.
+            The read only board maps are shared rather than copied.
+
+        :param other: The board to copy.
+        """
+        for attr, value in vars(other).items():
+            if isinstance(value, np.ndarray) and value.flags.writeable:
+                value = value.copy()
+
+            elif isinstance(value, list):
+                value = list(value)
+
+            setattr(self, attr, value)
+
+
+    @property
+    def pawns_all(self) -> int:
+        """ The bitboard of every pawn on the board, derived from the white and black pawn bitboards.
+        """
+        return self.pawns[WHITE] | self.pawns[BLACK]
+
+
     def print_object(self) -> None:
         """ Print to console all of the contents of the board object for debugging.
         """
@@ -109,71 +201,187 @@ class Board():
         
         print("pawns[0]: ", bitboards.print_bin(self.pawns[0]))
         print("pawns[1]: ", bitboards.print_bin(self.pawns[1]))
-        print("pawns[2]: ", bitboards.print_bin(self.pawns[2]))
+        print("pawnsAll: ", bitboards.print_bin(self.pawns_all))
         print()
-        print("pawns[0]: ", bitboards.printBitBoard(self.pawns[0]))
-        print("pawns[1]: ", bitboards.printBitBoard(self.pawns[1]))
-        print("pawns[2]: ", bitboards.printBitBoard(self.pawns[2]))
+        print("pawns[0]: ", bitboards.print_bitboard(self.pawns[0]))
+        print("pawns[1]: ", bitboards.print_bitboard(self.pawns[1]))
+        print("pawnsAll: ", bitboards.print_bitboard(self.pawns_all))
 
 
     def reset_materials(self) -> None:
         """ Reset all of the datatypes within the board object.
         """
-        self.pawns = (ull * 3)()
-        self.kingSquare = (uint * 2)()
+        self.kingSquare.fill(0)
 
-        self.pceNum = (uint * 13)()
-        self.bigPce = (uint * 2)()
-        self.majPce = (uint * 2)()
-        self.minPce = (uint * 2)()
-        self.material = (uint * 2)()
+        self.pceNum.fill(0)
+        self.bigPce.fill(0)
+        self.majPce.fill(0)
+        self.minPce.fill(0)
+        self.material.fill(0)
 
-        self.pList = (uint * 10 * 13)()
+        self.pList.fill(0)
+        self.pListIndex.fill(0)
 
-        self.pawns = [None] * 3
-        for i in range(3):
-            self.pawns[i] = ull(0)
+        self.pawns = [0] * 2
+        self.pceBitboards = [0] * 13
+        self.occupancy = [0] * 3
 
 
     def update_materials(self) -> None:
-        """ Updates all of the data structures. Called when a move has been made or undone.
+        """ Rebuild all of the data structures and the position key from the pieces array.
+            Only needed once a position has been loaded, moves update them with add_piece and remove_piece.
         """
         self.reset_materials()
+        self.posKey = 0
+
+        # Only visit the 64 on board squares, off board tiles never hold a piece.
+        for sq120 in bitboards.square64ToSquare120:
+            piece = int(self.pieces[sq120])
+
+            if piece != EMPTY:
+                self.add_piece(sq120, piece)
+
+        if self.turn == WHITE:
+            self.hash_side()
+
+        self.hash_castle()
+        self.hash_ep()
+
+
+    def add_piece(self, sq120: int, piece: int) -> None:
+        """ Place a piece on an empty square, updating every data structure and the position key.
+
+        :param sq120: The 120sq index to place the piece on.
+        :param piece: The piece index, as in enums.Piece.
+        """
+        colour = data.PieceCol[piece]
+        sq64 = bitboards.square120ToSquare64[sq120]
+
+        self.pieces[sq120] = piece
+        self.hash_piece(piece, sq120)
+
+        if data.PiecePawn[piece]:
+            self.pawns[colour] = bitboards.set_bit(self.pawns[colour], sq64)
+
+        elif data.PieceKing[piece]:
+            self.kingSquare[colour] = sq120
+
+        # Each table holds 1 if the piece belongs to that category, so no branching is needed.
+        self.bigPce[colour] += data.PieceBig[piece]
+        self.majPce[colour] += data.PieceMaj[piece]
+        self.minPce[colour] += data.PieceMin[piece]
+        self.material[colour] += data.PieceVal[piece]
+
+        # Append to the piece list, remembering where so it can be removed without a search.
+        self.pListIndex[sq120] = self.pceNum[piece]
+        self.pList[piece][self.pceNum[piece]] = sq120
+        self.pceNum[piece] += 1
+
+        sqMask = bitboards.setMask[sq64]
+        self.pceBitboards[piece] |= sqMask
+        self.occupancy[colour] |= sqMask
+        self.occupancy[BOTH] |= sqMask
+
+
+    def remove_piece(self, sq120: int) -> None:
+        """ Remove the piece on a square, updating every data structure and the position key.
+
+        :param sq120: The 120sq index of the piece to remove.
+        """
+        piece = int(self.pieces[sq120])
+        colour = data.PieceCol[piece]
+        sq64 = bitboards.square120ToSquare64[sq120]
+
+        self.pieces[sq120] = EMPTY
+        self.hash_piece(piece, sq120)
+
+        if data.PiecePawn[piece]:
+            self.pawns[colour] = bitboards.clear_bit(self.pawns[colour], sq64)
 
-        for sq120 in range(0, 120):
-            piece = self.pieces[sq120]
+        self.bigPce[colour] -= data.PieceBig[piece]
+        self.majPce[colour] -= data.PieceMaj[piece]
+        self.minPce[colour] -= data.PieceMin[piece]
+        self.material[colour] -= data.PieceVal[piece]
 
-            if piece != enums.Tiles.NO_SQUARE.value and piece != enums.Tiles.OFF_BOARD.value and piece != enums.Piece.EMPTY.value:
-                colour = data.PieceCol[piece]
+        # Move the last piece of the list into the removed slot.
+        self.pceNum[piece] -= 1
+        index = self.pListIndex[sq120]
+        lastSq120 = self.pList[piece][self.pceNum[piece]]
+        self.pList[piece][index] = lastSq120
+        self.pListIndex[lastSq120] = index
 
-                if piece == enums.Piece.wP.value:
-                    self.pawns[enums.Turn.WHITE.value] = bitboards.set_bit(self.pawns[enums.Turn.WHITE.value], self.map120To64[sq120])
-                    self.pawns[enums.Turn.BOTH.value] = bitboards.set_bit(self.pawns[enums.Turn.BOTH.value], self.map120To64[sq120])
+        sqMask = bitboards.clearMask[sq64]
+        self.pceBitboards[piece] &= sqMask
+        self.occupancy[colour] &= sqMask
+        self.occupancy[BOTH] &= sqMask
 
-                elif piece == enums.Piece.bP.value:
-                    self.pawns[enums.Turn.BLACK.value] = bitboards.set_bit(self.pawns[enums.Turn.BLACK.value], self.map120To64[sq120])
-                    self.pawns[enums.Turn.BOTH.value] = bitboards.set_bit(self.pawns[enums.Turn.BOTH.value], self.map120To64[sq120])    
 
-                # If the piece is a king, it is also a major piece and a big piece
-                elif piece == enums.Piece.wK.value or piece == enums.Piece.bK.value:
-                    self.kingSquare[colour] = sq120
-                    self.majPce[colour] += 1
-                    self.bigPce[colour] += 1
-                # If the piece is a major piece, it is also a big piece
-                elif data.PieceMaj[piece]:
-                    self.majPce[colour] += 1
-                    self.bigPce[colour] += 1
-                # Else if, the piece is a minor piece, it is also a big piece (elif prevents double counting big piece)
-                elif data.PieceMin[piece]:
-                    self.minPce[colour] += 1
-                    self.bigPce[colour] += 1
+    def hash_piece(self, piece: int, sq120: int) -> None:
+        """ XOR a piece on a square in or out of the position key.
 
-                self.material[colour] += data.PieceVal[piece]
+        :param piece: The piece index, as in enums.Piece.
+        :param sq120: The 120sq index the piece is added to or removed from.
+        """
+        self.posKey ^= hashkeys.pieceKeyInts[piece * 120 + sq120]
+
+
+    def hash_castle(self) -> None:
+        """ XOR the current castle permissions in or out of the position key.
+        """
+        self.posKey ^= hashkeys.castleKeyInts[self.castle]
+
+
+    def hash_ep(self) -> None:
+        """ XOR the current en passant square in or out of the position key.
+        """
+        if self.enPassant != NOSQ:
+            self.posKey ^= hashkeys.pieceKeyInts[EMPTY * 120 + self.enPassant]
+
+
+    def update_castle(self, from120: int, to120: int) -> None:
+        """ Mask out the castle permissions lost by a move touching the king or rook home squares,
+            updating the position key.
+
+        :param from120: The 120sq index the piece moved from.
+        :param to120: The 120sq index the piece moved to.
+        """
+        self.hash_castle()
+        self.castle &= data.CastlePerm[from120] & data.CastlePerm[to120]
+        self.hash_castle()
+
+
+    def hash_side(self) -> None:
+        """ XOR the side to play in or out of the position key. Called whenever the turn changes.
+        """
+        self.posKey ^= hashkeys.turnKeyInt
 
-                self.pList[piece][self.pceNum[piece]] = sq120
-                self.pceNum[piece] += 1
 
-        self.posKey = hashkeys.generate_pos_key(self)
+    def push_history(self, move: int, posKey: int) -> None:
+        """ Store the information needed to undo a move at the current ply, then advance the ply.
+
+        :param move: The move, bit shifted as described in Undo.
+        :param posKey: The position key before the move was made.
+        """
+        ply = self.hisply
+
+        self.histMove[ply] = move
+        self.histCastle[ply] = self.castle
+        self.histFiftyMoveClock[ply] = self.fiftyMoveClock
+        self.histEnPassant[ply] = self.enPassant
+        self.histPosKey[ply] = posKey
+
+        self.hisply += 1
+
+
+    def get_undo(self, ply: int) -> 'Undo':
+        """ Build an Undo object from the history arrays, for code that wants a single record such as
+            bitboards.print_undo_object.
+
+        :param ply: The ply to read.
+        :returns: The undo object for that ply.
+        """
+        return Undo(int(self.histMove[ply]), int(self.histCastle[ply]), int(self.histFiftyMoveClock[ply]),
+                     int(self.histEnPassant[ply]), int(self.histPosKey[ply]))
     
 
     def init_board_maps(self) -> None:
@@ -218,14 +426,9 @@ class Board():
                 A    B    C    D    E    F    G    H
         """
 
-        sq = 21
-        sq64 = 0
-        for rank in range (8): # Iterate up each file. (Board is printed flipped on horizontal axis.)
-            for file in range(8): # Iterate across each rank.
-                sq = data.file_rank_to_index(rank * 8 + file)
-                self.map64To120[sq64] = sq
-                self.map120To64[sq] = sq64
-                sq64 += 1
+        # The maps never change, so every board shares the read only module arrays.
+        self.map64To120 = data.Sq64To120
+        self.map120To64 = data.Sq120To64
     
     
     def read_fen(self, fen: str) -> None:
@@ -233,83 +436,8 @@ class Board():
         
         :param fen: The string to parse.
         """
-        rank = enums.Rank.RANK_8.value
-        file = enums.File.FILE_A.value
-        piece = 0
-
-        # Start at rank 8 and iterate.
-        while ((rank >= enums.Rank.RANK_1.value) and fen):
-            char = fen[0]
-            # Represents duplicates within FEN.
-            count = 1
-
-            match char:
-                case 'P': piece = enums.Piece.wP.value
-                case 'N': piece = enums.Piece.wN.value
-                case 'B': piece = enums.Piece.wB.value
-                case 'R': piece = enums.Piece.wR.value
-                case 'Q': piece = enums.Piece.wQ.value
-                case 'K': piece = enums.Piece.wK.value
-
-                case 'p': piece = enums.Piece.bP.value
-                case 'n': piece = enums.Piece.bN.value
-                case 'b': piece = enums.Piece.bB.value
-                case 'r': piece = enums.Piece.bR.value
-                case 'q': piece = enums.Piece.bQ.value
-                case 'k': piece = enums.Piece.bK.value
-
-                case '1' | '2' | '3' | '4' | '5' | '6' | '7' | '8':
-                    piece = enums.Piece.EMPTY.value
-                    count = int(char)
-
-                case '/' | ' ':
-                    file =  enums.File.FILE_A.value
-                    rank -= 1
-                    fen = fen[1:]
-                    continue
-
-                case _:
-                    pass
-
-            for _ in range(count):
-                sq64 = rank * 8 + file
-                sq120 = self.map64To120[sq64]
-
-                self.pieces[sq120] = piece
-                file += 1
-
-            # Set King Squares
-            if char == 'K':
-                self.kingSquare[0] = sq120
-            elif char == 'k':
-                self.kingSquare[1] = sq120
-
-            fen = fen[1:]
-
-        self.side = enums.Turn.WHITE.value if (fen[0] == 'w') else enums.Turn.BLACK.value
-        fen = fen[2:]
-
-        for _ in range(4):
-            if fen[0] == ' ':
-                break
-
-            char = fen[0]
-            match char:
-                case 'K': self.castle |= enums.Castle.WKCA.value
-                case 'Q': self.castle |= enums.Castle.WQCA.value
-                case 'k': self.castle |= enums.Castle.BKCA.value
-                case 'q': self.castle |= enums.Castle.BQCA.value
-                case _: pass
-
-            fen = fen[1:]
-
-        fen = fen[1:]
-
-        if fen[0] != '-':
-            file = ord(fen[0]) - 97
-            rank = ord(fen[1]) - 49
-
-            self.enPassant = data.file_rank_to_index(rank * 8 + file)
+        pieces, self.side, self.castle, self.enPassant = parse_fen(fen)
+        self.pieces[self.map64To120] = pieces
 
 
     def print_board(self) -> None:
@@ -327,17 +455,10 @@ class Board():
 
     def check_board(self) -> None:
         """ Assert that all values within the board's data structures match.
-            Close program with assertion otherwise.
+            Close program with assertion otherwise. Skipped entirely when run with -O.
         """
-        tempPceNum = (uint * 13)()
-        tempBigPce = (uint * 2)()
-        tempMajPce = (uint * 2)()
-        tempMinPce = (uint * 2)()
-        tempMaterial = (uint * 2)()
-        
-        tempPawns = [None] * 3
-        for i in range(3):
-            tempPawns[i] = self.pawns[i]
+        if not __debug__:
+            return
 
         for tempPiece in range (1, 13):
             tempPieceNum = 0
@@ -346,52 +467,42 @@ class Board():
                 sq120 = self.pList[tempPiece][tempPieceNum]
 
                 assert(self.pieces[sq120] == tempPiece)
+                assert(self.pListIndex[sq120] == tempPieceNum)
 
                 tempPieceNum += 1
 
-        # Set tempBig, min, MajPce and tempMaterial
-        for sq120 in range(0, 120):
-            tempPiece = self.pieces[sq120]
+        # Set tempBig, min, MajPce and tempMaterial from every occupied on board square at once.
+        tempPieces = self.pieces[self.map64To120]
+        tempPieces = tempPieces[tempPieces != EMPTY]
+        tempColours = data.PieceCol[tempPieces]
 
-            # If not equal to no square and not equal to off board and not equal to off board.
-            if tempPiece != enums.Tiles.NO_SQUARE.value and (tempPiece != enums.Tiles.OFF_BOARD.value
-                ) and tempPiece != enums.Piece.EMPTY.value:
-                tempColour = data.PieceCol[tempPiece]
-
-                if data.PieceMaj[tempPiece]:
-                    tempMajPce[tempColour] += 1
-                    tempBigPce[tempColour] += 1
-                elif data.PieceMin[tempPiece]:
-                    tempMinPce[tempColour] += 1
-                    tempBigPce[tempColour] += 1
-
-                tempMaterial[tempColour] += data.PieceVal[tempPiece]
-
-                tempPceNum[tempPiece] += 1
+        tempPceNum = np.bincount(tempPieces, minlength = 13)
+        tempMajPce = np.bincount(tempColours[data.PieceMaj[tempPieces]], minlength = 2)
+        tempMinPce = np.bincount(tempColours[data.PieceMin[tempPieces]], minlength = 2)
+        tempBigPce = np.bincount(tempColours[data.PieceBig[tempPieces]], minlength = 2)
+        tempMaterial = np.bincount(tempColours, weights = data.PieceVal[tempPieces], minlength = 2)
 
         # Assert tempPieceNum
-        for tempPiece in range(13):
-            assert(tempPceNum[tempPiece] == self.pceNum[tempPiece])
-
-        numWP = self.pceNum[enums.Piece.wP.value]
-        numBP = self.pceNum [enums.Piece.bP.value]
+        assert((tempPceNum == self.pceNum).all())
 
-        # Assert bitboards counts
-        assert(bitboards.CountBits(tempPawns[0]) == numWP)
-        assert(bitboards.CountBits(tempPawns[1]) == numBP)
-        assert(bitboards.CountBits(tempPawns[2]) == numWP + numBP)
+        # Rebuild every piece bitboard from the pieces array, bit i of each is 64sq i.
+        tempPieces = self.pieces[self.map64To120]
+        tempBitboards = [int.from_bytes(np.packbits(tempPieces == piece, bitorder = 'little').tobytes(), 'little')
+                         for piece in range(13)]
 
-        while (tempPawns[0]):
-            sq64 = bitboards.pop_bit((tempPawns[0]))
-            assert(self.pieces[self.map64To120[sq64]] == enums.Piece.wP.value)
+        # Assert bitboards
+        assert(tempBitboards[1:] == self.pceBitboards[1:])
+        assert(self.pawns[WHITE] == tempBitboards[WP])
+        assert(self.pawns[BLACK] == tempBitboards[BP])
+        assert(self.pawns_all == tempBitboards[WP] | tempBitboards[BP])
 
-        while (tempPawns[1]):
-            sq64 = bitboards.pop_bit((tempPawns[1]))
-            assert(self.pieces[self.map64To120[sq64]] == enums.Piece.bP.value)
+        tempWhite = 0
+        for piece in range(WP, BP):
+            tempWhite |= tempBitboards[piece]
 
-        while (tempPawns[2]):
-            sq64 = bitboards.pop_bit((tempPawns[2]))
-            assert(self.pieces[self.map64To120[sq64]] == enums.Piece.wP.value or self.pieces[self.map64To120[sq64]] == enums.Piece.bP.value)
+        assert(self.occupancy[WHITE] == tempWhite)
+        assert(self.occupancy[BOTH] == ~tempBitboards[EMPTY] & bitboards.FULL_BOARD)
+        assert(self.occupancy[BLACK] == self.occupancy[BOTH] ^ tempWhite)
 
         assert(tempMaterial[0] == self.material[0])
         assert(tempMaterial[1] == self.material[1])
@@ -409,29 +520,18 @@ class Board():
 
         assert(hashkeys.generate_pos_key(self) == self.posKey)
         
-        assert(self.enPassant == enums.Tiles.NO_SQUARE.value or (data.RanksBrd[self.enPassant] == enums.Rank.RANK_6 and self.side == enums.Turn.WHITE.value) or (data.RanksBrd[self.enPassant] == enums.Rank.RANK_3 and self.side == enums.Turn.BLACK.value))
+        assert(self.enPassant == NOSQ or (data.RanksBrd[self.enPassant] == RANK_6 and self.side == WHITE) or (data.RanksBrd[self.enPassant] == RANK_3 and self.side == BLACK))
 
-        assert(self.pieces[self.kingSquare[enums.Turn.WHITE.value]] == enums.Piece.wK.value)
-        assert(self.pieces[self.kingSquare[enums.Turn.BLACK.value]] == enums.Piece.bK.value)
+        assert(self.pieces[self.kingSquare[WHITE]] == WK)
+        assert(self.pieces[self.kingSquare[BLACK]] == BK)
 
         assert(0 <= self.castle <= 15)
 
-        def pce_list_assert() -> None:
-            """ Assert that the pceNum values are between (1, 9) and not off the board.
-            """
-            for pce in range(1, 13):
-                if 0 > self.pceNum[pce] >= 10:
-                    return False
-                
-                for i in range(self.pceNum[pce]):
-                    sq = self.pList[pce][i]
-                    if (data.FilesBrd[sq] == enums.Tiles.OFF_BOARD.value):
-                        return False
-                    
-            if self.pceNum[enums.Piece.wK.value] != 1 or self.pceNum[enums.Piece.bK.value] != 1:
-                return False
-                
-        assert(pce_list_assert)
+        # Every piece count fits the piece list, every listed square is on the board and each side has one king.
+        inList = np.arange(self.pList.shape[1]) < self.pceNum[:, None]
+        assert(((self.pceNum >= 0) & (self.pceNum <= self.pList.shape[1])).all())
+        assert((data.FilesBrd[self.pList[inList]] != OFF).all())
+        assert(self.pceNum[WK] == 1 and self.pceNum[BK] == 1)
 
 class Undo():
     def __init__(self, move: int, castle: int , fiftyMoveClock: int, enPassant: int, hashKey: int):
@@ -448,4 +548,17 @@ class Undo():
         self.castle = castle
         self.fiftyMoveClock = fiftyMoveClock
         self.enPassant = enPassant
-        self.hashKey = hashKey
\ No newline at end of file
+        self.hashKey = hashKey
+
+
+class GameRecord():
+    def __init__(self):
+        """ The PGN and display history of a match, owned by the UI so the search Board only carries
+            what move generation and evaluation need.
+        """
+        # The PGN text of each ply, and all of them joined.
+        self.pgnArr = []
+        self.pgn = ""
+
+        self.historyStack = []
+        self.historyStackCounts = []
@@ -0,0 +1,21 @@
+""" Shared fixtures for the tests.
+"""
+import board
+
+import pytest
+
+
+@pytest.fixture
+def board_from_fen():
+    """ Build a board and load a FEN onto it, rebuilding every data structure from the pieces.
+    """
+    def load(fen: str) -> board.Board:
+        gameBoard = board.Board()
+        gameBoard.read_fen(fen)
+        gameBoard.turn = gameBoard.side
+        gameBoard.update_materials()
+        gameBoard.check_board()
+
+        return gameBoard
+
+    return load
@@ -34,7 +34,27 @@ SideChar = "wb-"
 RankChar = "12345678"
 FileChar = "abcdefgh"
 
-# Piece Arrays
+# FEN lookups. Placement fields are expanded to one character per square ('.' for empty) then indexed by code point.
+FenExpand = str.maketrans({**{str(run): '.' * run for run in range(1, 9)}, '/': None})
+CharToPiece = np.zeros(256, dtype = np.uint8)
+CharToPiece[np.frombuffer(PceChar[1:].encode('ascii'), dtype = np.uint8)] = np.arange(1, 13)
+
+# From a castle character's code point to its permission bit.
+CastleFen = tuple({'K': enums.Castle.WKCA.value, 'Q': enums.Castle.WQCA.value, 'k': enums.Castle.BKCA.value,
+                   'q': enums.Castle.BQCA.value}.get(chr(code), 0) for code in range(256))
+
+# Castle permissions kept when a piece leaves or lands on each 120sq, AND masked in for both squares of a move.
+# Only the king and rook home squares clear any bits.
+_castlePerm = [15] * 120
+_castlePerm[enums.Tiles.A1.value] = 15 & ~enums.Castle.WQCA.value
+_castlePerm[enums.Tiles.H1.value] = 15 & ~enums.Castle.WKCA.value
+_castlePerm[enums.Tiles.E1.value] = 15 & ~(enums.Castle.WKCA.value | enums.Castle.WQCA.value)
+_castlePerm[enums.Tiles.A8.value] = 15 & ~enums.Castle.BQCA.value
+_castlePerm[enums.Tiles.H8.value] = 15 & ~enums.Castle.BKCA.value
+_castlePerm[enums.Tiles.E8.value] = 15 & ~(enums.Castle.BKCA.value | enums.Castle.BQCA.value)
+CastlePerm = tuple(_castlePerm)
+
+# Piece Arrays, indexed by piece. The boolean tables double as 0/1 counts when added to the board's piece counters.
 PieceBig = np.array([False, False, True, True, True, True, True, False, True, True, True, True, True])
 PieceMaj = np.array([False, False, False, False, True, True, True, False, False, False, True, True, True])
 PieceMin = np.array([False, False, True, True, False, False, False, False, True, True, False, False, False])
@@ -48,15 +68,27 @@ PieceRookQueen = np.array([False, False, False, False, True, True, False, False,
 PieceBishopQueen = np.array([False, False, False, True, False, True, False, False, False, True, False, True, False])
 PieceSlides = np.array([False, False, False, True, True, True, False, False, False, True, True, True, False])
 
-# Maps 120sq to corresponding ranks/files.
-FilesBrd = [enums.Tiles.OFF_BOARD.value] * 120
-RanksBrd = [enums.Tiles.OFF_BOARD.value] * 120
+# Board maps between 64sq and 120sq indices, the single copy every other lookup is built from. Off board tiles map to 65.
+_sq64 = np.arange(64)
+Sq64To120 = file_rank_to_index(_sq64)
+Sq120To64 = np.full(120, 65, dtype = np.int64)
+Sq120To64[Sq64To120] = _sq64
+Sq64To120.flags.writeable = False
+Sq120To64.flags.writeable = False
 
-for rank in range(8):
-    for file in range(8):
-        sq = file_rank_to_index(rank * 8 + file)
-        FilesBrd[sq] = file
-        RanksBrd[sq] = rank
+# Maps 120sq to corresponding ranks/files, OFF_BOARD for off board tiles.
+FilesBrd = np.full(120, enums.Tiles.OFF_BOARD.value, dtype = np.int8)
+RanksBrd = np.full(120, enums.Tiles.OFF_BOARD.value, dtype = np.int8)
+FilesBrd[Sq64To120] = _sq64 % 8
+RanksBrd[Sq64To120] = _sq64 // 8
+
+# File and rank of each 120sq packed as (file << 3) | rank in one lookup, -1 for off board tiles.
+FileRank = np.full(120, -1, dtype = np.int16)
+FileRank[Sq64To120] = (_sq64 % 8) << 3 | _sq64 // 8
+
+FilesBrd.flags.writeable = False
+RanksBrd.flags.writeable = False
+FileRank.flags.writeable = False
 
 KingDirection = [-11, -10, -9, -1, 1, 9, 10, 11]
 KnightDirection = [-21, -19, -12, -8, 8, 12, 19, 21]
@@ -69,11 +101,13 @@ res = ["RESOLUTION", "1280x720", "1920x1080", "2560x1440", "3840x2160"]
 # Indices for the promotion menu pieces. Lists: Queen, Knight, Rook, Bishop for respective colour.
 whitePromPieces = [enums.Piece.wQ, enums.Piece.wN, enums.Piece.wR, enums.Piece.wB]
 blackPromPieces = [enums.Piece.bQ, enums.Piece.bN, enums.Piece.bR, enums.Piece.bB]
+# Promotion menu pieces indexed by the tertiary promotion value (no, white, black) -> (0, 1, 2).
+promPieces = [None, whitePromPieces, blackPromPieces]
 
 # All of the general attributes (absolute pos relative to (0, 0))
 generalAttrs = ["board", "undo",  "pgnBox", "turnBox", "prom", "fromTile", "hamburger", "home", "speaker", "mute"]
 # These attributes shrink with window and float right.
-floatRightAttrs = {"hamburger", "home", "speaker", "mute"}
+floatRightAttrs = frozenset({"hamburger", "home", "speaker", "mute"})
 # These attributes represent fonts.
 fontAttrs = ["pgnHeader", "pgnText", "turnText", "saveText", "fsText"]
 # These attributes are PGN specific fonts that have their own absolute positioning.
@@ -82,11 +116,5 @@ pgnAttrs = ["pgnHeader", "pgnText"]
 nonPceImgs = ["board", "undo", "hamburger", "speaker", "mute", "home"]
 # These attributes are specific to the settings menu and have multiple buttons.
 bttnsAttrs = ["fs", "res"]
-
-# De Bruijn Sequence
-BitTable = [
-  63, 30, 3, 32, 25, 41, 22, 33, 15, 50, 42, 13, 11, 53, 19, 34, 61, 29, 2,
-  51, 21, 43, 45, 10, 18, 47, 1, 54, 9, 57, 0, 35, 62, 31, 40, 4, 49, 5, 52,
-  26, 60, 6, 23, 44, 46, 27, 56, 16, 7, 39, 48, 24, 59, 14, 12, 55, 38, 28,
-  58, 20, 37, 17, 36, 8
-]
\ No newline at end of file
+# These attributes can be clicked, their rects are recomputed on resize.
+clickableAttrs = ["board", "undo", "hamburger", "home", "mute", "speaker", "save", "fs", "res"]
\ No newline at end of file
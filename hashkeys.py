@@ -7,34 +7,63 @@
 from __future__ import annotations
 import board
 
+import os
+import data
 import enums
-from ctypes import c_ulonglong as ull
 import numpy as np
 
-pieceKeys = np.random.randint(low = 0, high = 18446744073709551615, size = (13, 120), dtype = ull)
-turnKey = np.random.randint(low = 0, high = 18446744073709551615, dtype = ull)
-castleKeys = np.random.randint(low = 0, high = 18446744073709551615, size = 16, dtype = ull)
+# The fixed 781 key Polyglot table: 768 piece keys, 4 castle keys, 8 en passant file keys and the turn key.
+POLYGLOT_KEYS = np.fromfile(os.path.join(os.path.dirname(os.path.abspath(__file__)), "polyglot_keys.bin"), dtype = '<u8').astype(np.uint64)
+POLYGLOT_CASTLE = 768
+POLYGLOT_EN_PASSANT = 772
+POLYGLOT_TURN = 780
 
-def generate_pos_key(gameBoard: board.Board()) -> ull:
+# Polyglot orders pieces bP, wP, bN, wN ... bK, wK, index 0 (EMPTY) is unused.
+_POLYGLOT_PIECE = [0] + [2 * piece + 1 for piece in range(6)] + [2 * piece for piece in range(6)]
+
+# Flat, contiguous piece keys. The key of a piece on a 120sq is at index piece * 120 + sq.
+# The EMPTY row holds the en passant key of each square's file.
+pieceKeys = np.zeros(13 * 120, dtype = np.uint64)
+SQ_64 = np.arange(64, dtype = np.intp)
+
+for piece in range(enums.Piece.wP.value, enums.Piece.bK.value + 1):
+    pieceKeys[piece * 120 + data.Sq64To120] = POLYGLOT_KEYS[_POLYGLOT_PIECE[piece] * 64 + SQ_64]
+
+pieceKeys[data.Sq64To120] = POLYGLOT_KEYS[POLYGLOT_EN_PASSANT + SQ_64 % 8]
+
+turnKey = POLYGLOT_KEYS[POLYGLOT_TURN]
+
+# Every castle permission combination is the XOR of the Polyglot keys of its set bits (WK, WQ, BK, BQ).
+castleKeys = np.zeros(16, dtype = np.uint64)
+for castle in range(16):
+    for bit in range(4):
+        if castle >> bit & 1:
+            castleKeys[castle] ^= POLYGLOT_KEYS[POLYGLOT_CASTLE + bit]
+
+# Python int copies of the keys, so single key XORs avoid converting a NumPy scalar each time.
+pieceKeyInts = pieceKeys.tolist()
+turnKeyInt = int(turnKey)
+castleKeyInts = castleKeys.tolist()
+
+# The piece keys as a 2D (piece, 64sq) table with a zero EMPTY row, so every square can be gathered without masking.
+squareKeys = np.zeros((13, 64), dtype = np.uint64)
+squareKeys[1:] = pieceKeys.reshape(13, 120)[1:, data.Sq64To120]
+
+def generate_pos_key(gameBoard: board.Board()) -> int:
     """ A function to create a hashkey given the pieces on the board.
 
     :param gameBoard: The game board object including information for each successive turn.
-    :returns: An unsigned long long representation of the hashkey.
+    :returns: An unsigned 64 bit integer representation of the hashkey.
     """
-    finalKey = ull(0)
-
-    for sq in range(120):
-        piece = gameBoard.pieces[sq]
-
-        if piece != enums.Tiles.NO_SQUARE.value and piece != enums.Piece.EMPTY.value and piece != enums.Tiles.OFF_BOARD.value:
-            finalKey ^= pieceKeys[piece][sq]
+    # Gather the key of every on board square in one pass, empty squares contribute 0, then XOR reduce in C.
+    finalKey = int(np.bitwise_xor.reduce(squareKeys[gameBoard.pieces[data.Sq64To120], SQ_64]))
 
     if gameBoard.turn == enums.Turn.WHITE.value:
-        finalKey ^= turnKey
+        finalKey ^= turnKeyInt
 
     if gameBoard.enPassant != enums.Tiles.NO_SQUARE.value:
-        finalKey ^= pieceKeys[enums.Piece.EMPTY.value][gameBoard.enPassant]
+        finalKey ^= pieceKeyInts[enums.Piece.EMPTY.value * 120 + gameBoard.enPassant]
 
-    finalKey ^= castleKeys[gameBoard.castle]
+    finalKey ^= castleKeyInts[gameBoard.castle]
 
-    return finalKey
\ No newline at end of file
+    return finalKey
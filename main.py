@@ -15,7 +15,10 @@ import menu
 import pygame
 from pygame.locals import *
 
-from typing import Tuple
+from typing import List, Optional, Tuple
+
+# Milliseconds the window must stop resizing for before artifacts are recomputed.
+RESIZE_DEBOUNCE_MS = 150
 
 def pygame_setup() -> Tuple[pygame.Surface, pygame.time.Clock, pygame.Surface]:
     """ Initalization functions used for the pygame library.
@@ -28,6 +31,11 @@ def pygame_setup() -> Tuple[pygame.Surface, pygame.time.Clock, pygame.Surface]:
     # Default pygame initialization.
     pygame.init()
 
+    # Drop the high volume input events the main loop never handles, so mouse motion and the like never reach Python.
+    # Window events are left alone, so resizes, maximise and restore come through however the display driver reports them.
+    pygame.event.set_blocked([MOUSEMOTION, MOUSEWHEEL, MOUSEBUTTONUP, KEYUP, TEXTINPUT, TEXTEDITING,
+                              FINGERMOTION, FINGERDOWN, FINGERUP, JOYAXISMOTION, JOYBALLMOTION, JOYHATMOTION])
+
     # Screen to draw onto. Open window on main display.
     screen = pygame.display.set_mode(enums.Resolution.RES_1920_1080.value, flags = pygame.RESIZABLE, display = 0)
 
@@ -49,18 +57,43 @@ def pygame_setup() -> Tuple[pygame.Surface, pygame.time.Clock, pygame.Surface]:
     return (screen, clock, settingsScreen)
 
 
-def draw_game_state(screen: pygame.Surface, gameBoard: board.Board, makeMove: move.Move, settingsScreen: pygame.Surface) -> None:
-    """ Called for each frame to draw the current game state.
+def draw_game_state(screen: pygame.Surface, gameBoard: board.Board, makeMove: move.Move, settingsScreen: pygame.Surface,
+                     fullRedraw: bool) -> Optional[List[pygame.Rect]]:
+    """ Called for each frame the game state changed to draw it.
         Draws the board, previous mousePos marker, and then the pieces.
+        The background, undo button and navigation bar never change between resizes, so unless fullRedraw
+        only the board, PGN box, turn indicator and mute toggle are repainted.
 
     :param screen: The surface area to draw onto.
     :param gameBoard: The game board object including information for each successive turn.
-    :param coords: An object representing pixel values and grid mousePoss for the game.
     :param makeMove: The move object containing information for a given turn.
     :param settingsScreen: The settings surface object to be drawn onto.
+    :param fullRedraw: Repaint the whole screen, after a resize or when the screen was covered.
+    :returns: The rects that were repainted, or None if the whole screen was.
     """
-    # Fill the background; This should also be moved somewhere else.
-    screen.fill(data.COLOUR_CHELSEA_CUCUMBER)
+    # The settings page covers the whole screen, so skip drawing the game underneath it.
+    if menu.Menu.settingsPage:
+        draw_settings(screen, settingsScreen)
+        return None
+
+    if fullRedraw:
+        # Fill the background.
+        screen.fill(data.COLOUR_CHELSEA_CUCUMBER)
+
+        # Blits the undo button onto the screen.
+        blit_source(screen, art.scaledImgs["undo"], art.undoPos)
+
+        # Draw the side navigation bar that contains settings menu, and volume toggle.
+        draw_rect(screen, art.sideNavBarPos, art.sideNavBarSize, data.COLOUR_LIGHT_TAUPE)
+
+        # Blit the hamburger menu icon for the settings button.
+        blit_source(screen, art.scaledImgs["hamburger"], art.hamburgerPos)
+
+    else:
+        # Clear the regions whose contents are drawn straight onto the background.
+        draw_rect(screen, art.pgnBoxPos, art.pgnBoxSize, data.COLOUR_CHELSEA_CUCUMBER)
+        draw_rect(screen, art.turnBoxPos, art.turnBoxSize, data.COLOUR_CHELSEA_CUCUMBER)
+        draw_rect(screen, art.mutePos, art.muteSize, data.COLOUR_LIGHT_TAUPE)
 
     # Draw the chess board onto the screen, starting from top left corner Already scaled.
     blit_source(screen, art.scaledImgs["board"], art.boardPos)
@@ -74,23 +107,14 @@ def draw_game_state(screen: pygame.Surface, gameBoard: board.Board, makeMove: mo
 
     # If a promotion is active in the game, draw the promotion menu.
     if makeMove.prom:
-        draw_prom_piece(screen, makeMove)
+        draw_prom_piece(screen)
 
     # Write the PGN
-    render_pgn(screen, gameBoard)
+    render_pgn(screen, makeMove.record)
 
     # Draw the turn indicator
     render_turn(screen, gameBoard)
 
-    # Blits the undo button onto the screen.
-    blit_source(screen, art.scaledImgs["undo"], art.undoPos)
-
-    # Draw the side navigation bar that contains settings menu, and volume toggle.
-    draw_rect(screen, art.sideNavBarPos, art.sideNavBarSize, data.COLOUR_LIGHT_TAUPE)
-
-    # Blit the hamburger menu icon for the settings button.
-    blit_source(screen, art.scaledImgs["hamburger"], art.hamburgerPos)
-
     # Blit the mute button onto the navigation bar.
     if menu.Menu.mute:
         blit_source(screen, art.scaledImgs["mute"], art.mutePos)
@@ -98,9 +122,11 @@ def draw_game_state(screen: pygame.Surface, gameBoard: board.Board, makeMove: mo
     else:
         blit_source(screen, art.scaledImgs["speaker"], art.speakerPos)
 
-    # If user selected settingsPage, display it.
-    if menu.Menu.settingsPage:
-        draw_settings(screen, settingsScreen)
+    if fullRedraw:
+        return None
+
+    return [pygame.Rect(art.boardPos, art.boardSize), pygame.Rect(art.pgnBoxPos, art.pgnBoxSize),
+            pygame.Rect(art.turnBoxPos, art.turnBoxSize), pygame.Rect(art.mutePos, art.muteSize)]
 
 
 def draw_settings(screen: pygame.Surface, settingsScreen: pygame.Surface) -> None:
@@ -133,8 +159,7 @@ def draw_pieces(screen: pygame.Surface) -> None:
 
     :param screen: The surface to be drawn onto.
     """
-    for key in art.pieceImgsPos.keys():
-        blit_source(screen, *art.pieceImgsPos[key])
+    screen.blits(art.pieceBlits, doreturn = False)
 
 
 def render_settings_save(screen: pygame.Surface) -> None:
@@ -142,8 +167,7 @@ def render_settings_save(screen: pygame.Surface) -> None:
     
     :param screen: The surface to be drawn onto.
     """
-    draw_rect(screen, art.savePos, art.saveSize, data.COLOUR_BONE_RED, 3)
-    blit_source(screen, render_font(art.saveTextFont, "SAVE"), art.savePos)
+    screen.blits(((art.settingsRectSurfs["save"], art.savePos), (art.textCache["SAVE"], art.savePos)), doreturn = False)
 
 
 def render_settings_fullscreen(screen: pygame.Surface) -> None:
@@ -151,12 +175,12 @@ def render_settings_fullscreen(screen: pygame.Surface) -> None:
 
     :param screen: The surface to be drawn onto.
     """
-    draw_rect(screen, art.fsPos[0], art.fsSize[0], data.COLOUR_LIGHT_TAUPE)
-    draw_rect(screen, art.fsPos[1], art.fsSize[1], data.COLOUR_BONE_RED)
-
-    blit_source(screen, render_font(art.fsTextFont, "FULLSCREEN"), art.fsPos[0])
     text = "ON" if menu.Menu.fullscreen else "OFF"
-    blit_source(screen, render_font(art.fsTextFont, text), art.fsPos[1])
+
+    screen.blits(((art.settingsRectSurfs["fs", 0], art.fsPos[0]),
+                  (art.settingsRectSurfs["fs", 1], art.fsPos[1]),
+                  (art.textCache["FULLSCREEN"], art.fsPos[0]),
+                  (art.textCache[text], art.fsPos[1])), doreturn = False)
 
 
 def render_settings_res(screen: pygame.Surface) -> None:
@@ -164,15 +188,11 @@ def render_settings_res(screen: pygame.Surface) -> None:
 
     :param screen: The surface to be drawn onto.
     """
-    # For each resolution option, draw the rectangle with appropriate colour and blit it.
-    for i in range(5):
-        colour = data.COLOUR_BONE_RED if i % 2 == 0 else data.COLOUR_LIGHT_TAUPE
-
-        if i == menu.Menu.resIndex:
-            colour = data.COLOUR_CLOUDY_BLUE
+    # Each resolution option's rect, highlighted if selected, then its label on top.
+    rectSurfs = [(art.settingsRectSurfs["res", i, i == menu.Menu.resIndex], art.resPos[i]) for i in range(5)]
+    labels = [(art.textCache[data.res[i]], art.resPos[i]) for i in range(5)]
 
-        draw_rect(screen, art.resPos[i], art.resSize[i], colour)
-        blit_source(screen, render_font(art.fsTextFont, data.res[i]), art.resPos[i])
+    screen.blits(rectSurfs + labels, doreturn = False)
 
 
 def render_turn(screen: pygame.Surface, gameBoard: board.Board) -> None:
@@ -183,48 +203,61 @@ def render_turn(screen: pygame.Surface, gameBoard: board.Board) -> None:
     """
 
     text = "WHITE" if gameBoard.turn == enums.Turn.WHITE.value else "BLACK"
-    blit_source(screen, render_font(art.turnTextFont, text), art.turnBoxPos)
+    blit_source(screen, art.textCache[text], art.turnBoxPos)
     
 
-def render_pgn(screen: pygame.Surface, gameBoard: board.Board) -> None:
+def render_pgn(screen: pygame.Surface, gameRecord: board.GameRecord) -> None:
     """ Draws the pgn text box onto the screen within the PGN box.
-        When a line has become filled, write below on a new line.
+        When a line has become filled, write below on a new line. Text past the bottom of the box is clipped.
     
     :param screen: The surface to be drawn onto.
-    :param gameBoard: The game board object including information for each successive turn.
+    :param gameRecord: The PGN and history of the match.
     """
     draw_rect(screen, art.pgnBoxPos, art.pgnBoxSize, data.COLOUR_BONE_RED, 5)
-    blit_source(screen, render_font(art.pgnHeaderFont, "PGN:"), art.pgnHeaderPos)
+    blit_source(screen, art.pgnHeaderSurface, art.pgnHeaderPos)
 
-    words = gameBoard.pgn.split(' ')
-    tempX, tempY = art.pgnTextPos
+    words = gameRecord.pgn.split(' ')
+    startX, tempY = art.pgnTextPos
+    tempX = startX
+    wordBlits = []
 
-    # For each word in the PGN, blit it to the right if room, otherwise on a new line.
+    # Words wrap at the same margin from the right of the box as the text starts from its left.
+    rightEdge = art.pgnBoxPos[0] + art.pgnBoxSize[0] - (startX - art.pgnBoxPos[0])
+    wordCache = art.pgnWordCache
+    font = art.pgnTextFont
+
+    # For each word in the PGN, place it to the right if room, otherwise on a new line.
+    # Each distinct word is only rendered once per font.
     for word in words:
-        renderedWord = render_font(art.pgnTextFont, word + ' ')
+        renderedWord = wordCache.get(word)
+
+        if renderedWord is None:
+            renderedWord = wordCache[word] = render_font(font, word + ' ')
 
-        if renderedWord.get_width() + tempX > (art.pgnBoxPos[0] + art.pgnBoxSize[0] - (art.pgnTextPos[0] - art.pgnBoxPos[0])):
-            tempY += renderedWord.get_height()
-            tempX = art.pgnTextPos[0]
+        wordWidth, wordHeight = renderedWord.get_size()
 
-        screen.blit(renderedWord, (tempX, tempY))
-        tempX += renderedWord.get_width()
+        if tempX + wordWidth > rightEdge:
+            tempY += wordHeight
+            tempX = startX
 
+        wordBlits.append((renderedWord, (tempX, tempY)))
+        tempX += wordWidth
 
-def draw_prom_piece(screen: pygame.surface, makeMove: move.Move) -> None:
+    # Clip to the PGN box, text wrapped past its bottom would otherwise land outside the dirty rects and never be cleared.
+    previousClip = screen.get_clip()
+    screen.set_clip(pygame.Rect(art.pgnBoxPos, art.pgnBoxSize))
+    screen.blits(wordBlits, doreturn = False)
+    screen.set_clip(previousClip)
+
+
+def draw_prom_piece(screen: pygame.surface) -> None:
     """ Draw the promotion menu onto the board when a pawn advances to the 8th (or 1st) rank.
         Blits the respective images for each piece, drawn on the promotion square.
 
     :param screen: The surface area to draw onto.
-    :param makeMove: The move object containing information for a given turn.
     """
     draw_rect(screen, art.promPos, art.promSize, data.COLOUR_RED)
-    
-    # imageIndices = data.whitePromotionIndices if makeMove.prom == 1 else data.blackPromotionIndices
-    imgIndices = data.whitePromPieces if makeMove.prom == 1 else data.blackPromPieces
-    for index, value in enumerate(imgIndices):
-        # blit_source(screen, art.scaledImgs[str(value)], (art.promPos[0], art.promPos[1] + art.fromTileSize[1] * index))
-        blit_source(screen, art.scaledImgs[str(value.value)], (art.promPos[0], art.promPos[1] + art.fromTileSize[1] * index))
+    screen.blits(art.promBlits, doreturn = False)
     
 
 def blit_source(screen: pygame.Surface, source: pygame.Surface, pos: Tuple[int, int]) -> None:
@@ -252,6 +285,7 @@ def draw_rect(screen: pygame.Surface, pos: Tuple[int, int], size: Tuple[int, int
 def render_font(font: pygame.font.Font, text: str, colour: Tuple[int, int, int] = data.COLOUR_BLACK,
                  antialias: bool = False) -> pygame.Surface:
     """ Generic render function to blit fonts onto the screen.
+        The text is converted to the display's pixel format, so blitting it each frame needs no conversion.
 
     :param font: The font object to render.
     :param text: The string literal to be displayed.
@@ -260,7 +294,7 @@ def render_font(font: pygame.font.Font, text: str, colour: Tuple[int, int, int]
 
     :returns: A surface of the rendered font.
     """
-    return font.render(text, antialias, colour)
+    return font.render(text, antialias, colour).convert_alpha()
 
 
 def main():
@@ -282,6 +316,12 @@ def main():
     # Initalize all of the artifacts values.
     artifacts.calculate_resize(*enums.Resolution.RES_1920_1080.value, gameBoard)
 
+    # Tick of the latest unhandled window resize, None if there is none.
+    pendingResizeAt = None
+
+    # Whether the game state changed this frame, and whether the whole screen needs repainting.
+    redraw = fullRedraw = True
+
     running = True
     while running:
         for event in pygame.event.get():
@@ -292,12 +332,18 @@ def main():
             # If the escape key is pressed, toggle the settings menu.
             elif event.type == KEYDOWN and event.key == K_ESCAPE:
                 menu.toggle_settings_page()
+                fullRedraw = True
+
+            # If the window was uncovered, its contents must be repainted.
+            elif event.type == VIDEOEXPOSE:
+                fullRedraw = True
 
             # If there is registered mouse input, and it's a left-click.
-            if event.type == MOUSEBUTTONDOWN and event.button == 1:
+            elif event.type == MOUSEBUTTONDOWN and event.button == 1:
 
                 # Get the current mouse mousePos.
                 mousePos = pygame.mouse.get_pos()
+                redraw = True
 
                 # If on the main page.
                 if not menu.Menu.settingsPage:
@@ -333,33 +379,19 @@ def main():
                     # If hamburger menu selected, toggle settings vs main screen.
                     elif artifacts.is_clicked("hamburger", mousePos):
                         menu.toggle_settings_page()
+                        fullRedraw = True
                         
                 # If on the settings page.
                 else:
                     # Hamburger menu selected, toggle home/settings page.
                     if artifacts.is_clicked("hamburger", mousePos):
                         menu.toggle_settings_page()
+                        fullRedraw = True
 
                     # Fullscreen selected, toggle it.
                     elif artifacts.is_clicked("fs", mousePos, index = 1):
                         menu.toggle_fullscreen()
 
-                    # 1280x720 res seleted, set it.
-                    elif artifacts.is_clicked("res", mousePos, index = enums.ResolutionIndex.IND_1280_720.value):
-                        menu.set_res(enums.ResolutionIndex.IND_1280_720.value)
-
-                    # 1920x1080 res selected, set it.
-                    elif artifacts.is_clicked("res", mousePos, index = enums.ResolutionIndex.IND_1920_1080.value):
-                        menu.set_res(enums.ResolutionIndex.IND_1920_1080.value)
-
-                    # 2560x1440 res selected, set it.
-                    elif artifacts.is_clicked("res", mousePos, index = enums.ResolutionIndex.IND_2560_1440.value):
-                        menu.set_res(enums.ResolutionIndex.IND_2560_1440.value)
-
-                    # 3840x2160 res selected, set it.
-                    elif artifacts.is_clicked("res", mousePos, index = enums.ResolutionIndex.IND_3840_2160.value):
-                        menu.set_res(enums.ResolutionIndex.IND_3840_2160.value)
-
                     # Save button selected, update screen size values.
                     elif artifacts.is_clicked("save", mousePos):
                         displayFlags = pygame.FULLSCREEN if menu.Menu.fullscreen else pygame.RESIZABLE
@@ -367,18 +399,40 @@ def main():
                         screen = settingsScreen = pygame.display.set_mode(menu.Menu.res, flags = displayFlags, display = 0)
                         artifacts.calculate_resize(screen.get_width(), screen.get_height(), gameBoard)
 
-            # If window resized, recompute artifacts.
-            elif event.type == VIDEORESIZE:
-                artifacts.calculate_resize(screen.get_width(), screen.get_height(), gameBoard)
-            
-            # Draw the current game state.
-            draw_game_state(screen, gameBoard, makeMove, settingsScreen)
-
-        # Update game clock.
-        clock.tick(menu.Menu.fpsLimit)
+                    # Otherwise, if a resolution was selected, set it.
+                    else:
+                        for resIndex in menu.RES_BY_INDEX:
+                            if artifacts.is_clicked("res", mousePos, index = resIndex):
+                                menu.set_res(resIndex)
+                                break
 
-        # Updates everything on the display surface to the screen.
-        pygame.display.flip()
+            # If window resized, defer recomputing artifacts until resizing stops.
+            # A resize back to the size the artifacts were computed for cancels the pending one.
+            elif event.type == VIDEORESIZE:
+                pendingResizeAt = pygame.time.get_ticks() if (event.w, event.h) != art.lastSize else None
+                fullRedraw = True
+
+        # If the window has stopped resizing, recompute artifacts once for the final size.
+        if pendingResizeAt is not None and pygame.time.get_ticks() - pendingResizeAt > RESIZE_DEBOUNCE_MS:
+            artifacts.calculate_resize(screen.get_width(), screen.get_height(), gameBoard)
+            pendingResizeAt = None
+            fullRedraw = True
+
+        # Draw the current game state once per frame, only if something changed since the last one.
+        dirtyRects = []
+        drawn = redraw or fullRedraw
+        if drawn:
+            dirtyRects = draw_game_state(screen, gameBoard, makeMove, settingsScreen, fullRedraw)
+            redraw = fullRedraw = False
+
+        # Update game clock, idling at a lower rate while nothing on screen is changing.
+        clock.tick(menu.Menu.fpsLimit if drawn else menu.Menu.idleFpsLimit)
+
+        # Updates only the repainted regions of the display surface to the screen, or all of it after a full redraw.
+        if dirtyRects is None:
+            pygame.display.flip()
+        elif dirtyRects:
+            pygame.display.update(dirtyRects)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
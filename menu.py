@@ -7,16 +7,25 @@
 from artifacts import Artifacts as art
 import enums
 
+# The resolution selected by each settings page index.
+RES_BY_INDEX = {
+    enums.ResolutionIndex.IND_1280_720.value: enums.Resolution.RES_1280_720.value,
+    enums.ResolutionIndex.IND_1920_1080.value: enums.Resolution.RES_1920_1080.value,
+    enums.ResolutionIndex.IND_2560_1440.value: enums.Resolution.RES_2560_1440.value,
+    enums.ResolutionIndex.IND_3840_2160.value: enums.Resolution.RES_3840_2160.value,
+}
+
 class Menu():
     """ A static class containing information related to the settings of the game.
-        Audio, resolution, and fps limit reside here.
+        Audio, resolution, and fps limits reside here. The idle limit applies to frames where nothing is redrawn.
     """
     mute = False #Mute bool
     fullscreen = False #Fullscreen bool
     settingsPage = False #bool to show settings page
     res = enums.Resolution.RES_1920_1080.value
     resIndex = -1
-    fpsLimit = 144
+    fpsLimit = 60
+    idleFpsLimit = 30
 
 
 def toggle_mute() -> None:
@@ -43,19 +52,7 @@ def set_res(index) -> None:
 
     :param index: The value associated to a resolution. 
     """
-    match index:
-        case enums.ResolutionIndex.IND_1280_720.value:
-            Menu.res = enums.Resolution.RES_1280_720.value
-
-        case enums.ResolutionIndex.IND_1920_1080.value:
-            Menu.res = enums.Resolution.RES_1920_1080.value
-
-        case enums.ResolutionIndex.IND_2560_1440.value:
-            Menu.res = enums.Resolution.RES_2560_1440.value
-
-        case enums.ResolutionIndex.IND_3840_2160.value:
-            Menu.res = enums.Resolution.RES_3840_2160.value
-
+    Menu.res = RES_BY_INDEX.get(index, Menu.res)
     Menu.resIndex = index
 
 
@@ -5,7 +5,7 @@
 :version: v1.0.0
 """
 import board
-import hashkeys
+import bitboards
 import enums
 import data
 from artifacts import Artifacts as art
@@ -14,6 +14,33 @@ import menu
 
 from typing import Tuple
 
+# Enum values bound once, so building a move compares and ORs plain ints.
+WP = enums.Piece.wP.value
+BP = enums.Piece.bP.value
+NOSQ = enums.Tiles.NO_SQUARE.value
+RANK_1 = enums.Rank.RANK_1.value
+RANK_2 = enums.Rank.RANK_2.value
+RANK_7 = enums.Rank.RANK_7.value
+RANK_8 = enums.Rank.RANK_8.value
+
+TO_SHIFT = enums.MoveBitmasks.TO_SHIFT.value
+CAPTURED_SHIFT = enums.MoveBitmasks.CAPTURED_SHIFT.value
+EN_PASSANT_MASK = enums.MoveBitmasks.EN_PASSANT_MASK.value
+PAWN_START_MASK = enums.MoveBitmasks.PAWN_START_MASK.value
+CASTLING_MASK = enums.MoveBitmasks.CASTLING_MASK.value
+
+# The promotion bit of each piece a pawn can promote to.
+PROM_MASKS = {
+    enums.Piece.wQ.value: enums.MoveBitmasks.PROMOTED_Q_MASK.value,
+    enums.Piece.bQ.value: enums.MoveBitmasks.PROMOTED_Q_MASK.value,
+    enums.Piece.wN.value: enums.MoveBitmasks.PROMOTED_N_MASK.value,
+    enums.Piece.bN.value: enums.MoveBitmasks.PROMOTED_N_MASK.value,
+    enums.Piece.wR.value: enums.MoveBitmasks.PROMOTED_R_MASK.value,
+    enums.Piece.bR.value: enums.MoveBitmasks.PROMOTED_R_MASK.value,
+    enums.Piece.wB.value: enums.MoveBitmasks.PROMOTED_B_MASK.value,
+    enums.Piece.bB.value: enums.MoveBitmasks.PROMOTED_B_MASK.value,
+}
+
 class Move():
     def __init__(self):
         """ A class representing a move within the game.
@@ -34,6 +61,12 @@ class Move():
         # The en passant square (square a pawn can move to.)
         self.enPassant = enums.Tiles.NO_SQUARE.value
 
+        # The position key before the move, stored in history to restore on undo.
+        self.posKey = 0
+
+        # The PGN of the match, kept off the board.
+        self.record = board.GameRecord()
+
 
     def mouse_pos_to_120(self, mousePos: Tuple[int, int]) -> int:
         """ Given mouse coordinates, convert to 120sq index.
@@ -41,9 +74,8 @@ class Move():
         :param mousePos: The (x, y) values of the mouse.
         :returns: The 120sq index for the board.
         """
-        file = int(mousePos[0] // (art.fromTileSize[0]))
-        rank = 7 - int(mousePos[1] // (art.fromTileSize[1]))
-        return data.file_rank_to_index(rank * 8 + file)
+        tileWidth, tileHeight = art.fromTileSize
+        return bitboards.square64ToSquare120[(7 - int(mousePos[1] // tileHeight)) * 8 + int(mousePos[0] // tileWidth)]
 
 
     def set_from_index_120(self, mousePos: Tuple[int, int], gameBoard: board.Board()) -> None:
@@ -69,9 +101,7 @@ class Move():
 
         :param mousePos: The (x, y) values of the mouse.
         """
-        file = int(mousePos[0] // (art.fromTileSize[0]))
-        rank = 7 - int(mousePos[1] // (art.fromTileSize[1]))
-        self.to120 = data.file_rank_to_index(rank * 8 + file)
+        self.to120 = self.mouse_pos_to_120(mousePos)
 
     def update_history(self, gameBoard: board.Board()) -> None:
         """ Bit shift all relavent move information into a variable and store it in history array.
@@ -80,51 +110,32 @@ class Move():
 
         :param gameBoard: The game board object including information for each successive turn.
         """
-        move = 0
-        move |= self.from120 # 7 bits determining where the piece is moving from
-        move |= (self.to120 << 7) # 7 bits determining where the piece is moving to
-        move |= (self.capturedPiece << 14) # 4 bits determining which piece was captured
-
-        # If enPassant capture.
-        if self.enPassant != enums.Tiles.NO_SQUARE.value:
-            move |= enums.MoveBitmasks.EN_PASSANT_MASK.value # Forcing true for now.
-
-        # If a white pawn has moved, or a black pawn has moved.
-        if (self.fromPiece == enums.Piece.wP.value and data.RanksBrd[self.from120] ==
-             enums.Rank.RANK_2.value) or (self.fromPiece == enums.Piece.bP.value and
-             data.RanksBrd[self.from120] == enums.Rank.RANK_7.value):
-            move |= enums.MoveBitmasks.PAWN_START_MASK.value
-
-        # If white or black is promoting.
-        if (self.fromPiece == enums.Piece.wP.value and data.RanksBrd[self.to120] ==
-             enums.Rank.RANK_8.value) or (self.fromPiece == enums.Piece.bP.value 
-             and data.RanksBrd[self.to120] == enums.Rank.RANK_1.value):
-            match self.promPiece:
-                case enums.Piece.wQ.value | enums.Piece.bQ.value:
-                    move |= enums.MoveBitmasks.PROMOTED_Q_MASK.value
-                case enums.Piece.wN.value | enums.Piece.bN.value:
-                    move |= enums.MoveBitmasks.PROMOTED_N_MASK.value
-                case enums.Piece.wR.value | enums.Piece.bR.value:
-                    move |= enums.MoveBitmasks.PROMOTED_R_MASK.value
-                case enums.Piece.wB.value | enums.Piece.bB.value:
-                    move |= enums.MoveBitmasks.PROMOTED_B_MASK.value
-
-        # If it was a castling move.
-        if (True):
-            move |= enums.MoveBitmasks.CASTLING_MASK.value # Forcing true for now.
+        fromPiece = self.fromPiece
+        fromRank = data.RanksBrd[self.from120]
+        toRank = data.RanksBrd[self.to120]
+
+        # A white pawn leaving rank 2 or a black pawn leaving rank 7 is a pawn start.
+        isPawnStart = (fromPiece == WP and fromRank == RANK_2) or (fromPiece == BP and fromRank == RANK_7)
+        # A white pawn reaching rank 8 or a black pawn reaching rank 1 is promoting.
+        isPromotion = (fromPiece == WP and toRank == RANK_8) or (fromPiece == BP and toRank == RANK_1)
+
+        move = (self.from120 # 7 bits determining where the piece is moving from
+                | self.to120 << TO_SHIFT # 7 bits determining where the piece is moving to
+                | self.capturedPiece << CAPTURED_SHIFT # 4 bits determining which piece was captured
+                | (EN_PASSANT_MASK if self.enPassant != NOSQ else 0) # Forcing true for now.
+                | (PAWN_START_MASK if isPawnStart else 0)
+                | (PROM_MASKS.get(self.promPiece, 0) if isPromotion else 0)
+                | CASTLING_MASK) # Forcing true for now.
 
         # Handle PGN
         self.process_pgn(gameBoard)
 
-        # Create Undo object and add to history
-        currentPosHistory = board.Undo(move, gameBoard.castle, gameBoard.fiftyMoveClock,
-                                        gameBoard.enPassant, hashkeys.generate_pos_key(gameBoard))
-        gameBoard.history[gameBoard.hisply] = currentPosHistory
-        gameBoard.hisply += 1
+        # Add to history
+        gameBoard.push_history(move, self.posKey)
 
 
     def process_pgn(self, gameBoard: board.Board()) -> None:
-        """ Create the PGN for the current move and add it to the board object.
+        """ Create the PGN for the current move and add it to the game record.
         
         :param gameBoard: The game board object including information for each successive turn.
         """
@@ -133,9 +144,9 @@ class Move():
             pgnInstance += str(int(gameBoard.hisply / 2 + 1)) + ". "
             
         pgnInstance += enums.Tiles(self.to120).name + " "
-        gameBoard.pgnArr.append(pgnInstance)
+        self.record.pgnArr.append(pgnInstance)
 
-        gameBoard.pgn += pgnInstance
+        self.record.pgn += pgnInstance
 
 
     def process_move(self, mousePos: Tuple[int, int], gameBoard: board.Board()):
@@ -152,10 +163,12 @@ class Move():
         self.set_to_index_120(mousePos)
         self.check_legal_move(gameBoard)
 
+        self.posKey = gameBoard.posKey
+
         # Update pieces array
-        self.fromPiece = gameBoard.pieces[self.from120]
-        gameBoard.pieces[self.from120] = 0
-        self.capturedPiece = gameBoard.pieces[self.to120] # Critical
+        self.fromPiece = int(gameBoard.pieces[self.from120])
+        gameBoard.remove_piece(self.from120)
+        self.capturedPiece = int(gameBoard.pieces[self.to120]) # Critical
 
         # Play capture sound
         if self.capturedPiece != enums.Piece.EMPTY.value:
@@ -163,7 +176,10 @@ class Move():
         else:
             menu.play_sound("movePiece")
 
-        gameBoard.pieces[self.to120] = self.fromPiece
+        if self.capturedPiece != enums.Piece.EMPTY.value:
+            gameBoard.remove_piece(self.to120)
+
+        gameBoard.add_piece(self.to120, self.fromPiece)
 
         # If white promotion
         if (self.fromPiece == enums.Piece.wP.value and data.RanksBrd[self.to120] ==
@@ -181,14 +197,11 @@ class Move():
 
             return
         
-        # Update board materials
-        gameBoard.update_materials()
-
-        # Update move history
+        # Update move history, then drop any castle rights lost by this move.
         self.update_history(gameBoard)
+        gameBoard.update_castle(self.from120, self.to120)
 
-        # Update artifact images for pieces.
-        artifacts.update_pieces(gameBoard)
+        # Update artifact images for pieces. Every piece is already scaled in the atlas.
         artifacts.set_piece_imgs_positions(gameBoard)
 
         # Update 50 move clock
@@ -197,6 +210,7 @@ class Move():
 
         # Change who's turn it is
         gameBoard.turn = int(not gameBoard.turn)
+        gameBoard.hash_side()
 
         self.reset_move()        
     
@@ -206,16 +220,15 @@ class Move():
 
         :param gameBoard: The game board object including information for each successive turn.
         """
-        previousUndoObject = gameBoard.history[gameBoard.hisply - 1]
-
         # If there is a move to undo.
-        if previousUndoObject:
-            previousMove = previousUndoObject.move
+        if gameBoard.hisply > 0:
+            ply = gameBoard.hisply - 1
+            previousMove = int(gameBoard.histMove[ply])
 
             from120 = previousMove & enums.MoveBitmasks.FROM_MASK.value
             to120 = (previousMove & enums.MoveBitmasks.TO_MASK.value) >> enums.MoveBitmasks.TO_SHIFT.value
             capturedPiece = (previousMove & enums.MoveBitmasks.CAPTURED_MASK.value) >> enums.MoveBitmasks.CAPTURED_SHIFT.value
-            piece = gameBoard.pieces[to120]
+            piece = int(gameBoard.pieces[to120])
 
             # Set pawn to correct colour when undoing a promotion.
             if (previousMove & enums.MoveBitmasks.PROMOTED_PIECE_MASK.value and gameBoard.turn == enums.Turn.BLACK.value):
@@ -223,26 +236,24 @@ class Move():
             elif (previousMove & enums.MoveBitmasks.PROMOTED_PIECE_MASK.value and gameBoard.turn == enums.Turn.WHITE.value):
                 piece = enums.Piece.bP.value
 
-            gameBoard.pieces[from120] = piece
-            gameBoard.pieces[to120] = capturedPiece
+            gameBoard.remove_piece(to120)
+            if capturedPiece != enums.Piece.EMPTY.value:
+                gameBoard.add_piece(to120, capturedPiece)
+            gameBoard.add_piece(from120, piece)
 
-            gameBoard.castle = previousUndoObject.castle
-            gameBoard.fiftyMoveClock = previousUndoObject.fiftyMoveClock
-            gameBoard.enPassant = previousUndoObject.enPassant
-            gameBoard.posKey = previousUndoObject.hashKey
+            gameBoard.castle = int(gameBoard.histCastle[ply])
+            gameBoard.fiftyMoveClock = int(gameBoard.histFiftyMoveClock[ply])
+            gameBoard.enPassant = int(gameBoard.histEnPassant[ply])
+            gameBoard.posKey = int(gameBoard.histPosKey[ply])
 
             gameBoard.hisply -= 1 if gameBoard.hisply > 0 else 0
             gameBoard.fiftyMoveClock -= 1 if gameBoard.fiftyMoveClock > 0 else 0
             gameBoard.turn = int(not gameBoard.turn)
             self.prom = False
 
-            gameBoard.update_materials()
-
-            # Update PGN
-            gameBoard.pgn = ""
-            gameBoard.pgnArr.pop()
-            for i in range(gameBoard.hisply):
-                gameBoard.pgn += gameBoard.pgnArr[i]
+            # Update PGN, dropping the undone move's text from the end.
+            popped = self.record.pgnArr.pop()
+            self.record.pgn = self.record.pgn[:len(self.record.pgn) - len(popped)]
 
             # Update artifact images for pieces.
             artifacts.set_piece_imgs_positions(gameBoard)
@@ -256,15 +267,17 @@ class Move():
         """
         self.promPiece = promPiece
 
-        gameBoard.pieces[self.from120] = enums.Piece.EMPTY.value
-        gameBoard.pieces[self.to120] = self.promPiece
+        # Swap the pawn for the promoted piece.
+        gameBoard.remove_piece(self.to120)
+        gameBoard.add_piece(self.to120, self.promPiece)
 
-        gameBoard.update_materials()
         gameBoard.turn = int(not gameBoard.turn)
+        gameBoard.hash_side()
 
         artifacts.set_piece_imgs_positions(gameBoard)
 
         self.update_history(gameBoard)
+        gameBoard.update_castle(self.from120, self.to120)
         self.reset_move()
 
 
@@ -0,0 +1,17 @@
+""" Checks that the cached click rects hit test like the inclusive bounds they replaced.
+"""
+import artifacts
+
+import pytest
+
+
+@pytest.mark.parametrize("pos, size", [((10, 20), (30, 40)), ((10.6, 20.2), (30.5, 40.5)), ((0.5, 0.5), (0.25, 1.5))])
+def test_click_rect_includes_every_edge(pos, size):
+    """ A pixel is in the rect exactly when pos <= pixel <= pos + size, so the right and bottom edges still click.
+    """
+    rect = artifacts.click_rect(pos, size)
+
+    for x in range(int(pos[0]) - 2, int(pos[0] + size[0]) + 3):
+        for y in range(int(pos[1]) - 2, int(pos[1] + size[1]) + 3):
+            inside = pos[0] <= x <= pos[0] + size[0] and pos[1] <= y <= pos[1] + size[1]
+            assert bool(rect.collidepoint(x, y)) == inside, (x, y)
@@ -0,0 +1,42 @@
+""" Checks that the bitboard fills in attacked_bb agree with the per-square is_attacked lookups.
+"""
+import attacks
+import bitboards
+import board
+import enums
+
+import pytest
+
+WHITE = enums.Turn.WHITE.value
+BLACK = enums.Turn.BLACK.value
+
+FENS = [
+    # Starting position.
+    board.STARTING_POS_FEN,
+    # Kiwipete, every piece type with open lines in both directions.
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    # Slider pins: a rook pins the bishop and a bishop pins the knight to each king.
+    "4k3/4r3/8/1B6/8/3N4/4B3/b3K3 w - - 0 1",
+    # En passant available on f6.
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    # Pawns about to promote on the edge files, with sliders along the back ranks.
+    "r6k/P6P/8/8/8/8/p6p/R6K b - - 0 1",
+    # Queens in opposite corners of an almost empty board.
+    "Q6q/8/8/8/8/8/8/k6K w - - 0 1",
+]
+
+
+@pytest.mark.parametrize("fen", FENS)
+@pytest.mark.parametrize("bySide", [WHITE, BLACK])
+def test_attacked_bb_matches_is_attacked(board_from_fen, fen, bySide):
+    """ Every square set in attacked_bb is attacked according to is_attacked, and no other square is.
+    """
+    gameBoard = board_from_fen(fen)
+    attacked = attacks.attacked_bb(gameBoard, bySide)
+
+    # is_attacked looks for attackers of the side not to play.
+    gameBoard.turn = int(not bySide)
+
+    for sq64 in range(64):
+        sq120 = bitboards.square64ToSquare120[sq64]
+        assert bool(attacked >> sq64 & 1) == attacks.is_attacked(sq120, gameBoard), enums.Tiles(sq120).name
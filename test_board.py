@@ -0,0 +1,30 @@
+""" Smoke checks that a board can be built and passes its own consistency checks.
+"""
+import board
+
+import pytest
+
+
+def test_new_board_passes_check_board():
+    """ Building a Board runs check_board, which must pass for the starting position.
+    """
+    gameBoard = board.Board()
+    gameBoard.check_board()
+
+
+def test_moved_piece_passes_check_board():
+    """ Moving a piece with remove_piece and add_piece keeps every data structure consistent.
+    """
+    gameBoard = board.Board()
+    piece = int(gameBoard.pieces[35]) # E2
+
+    gameBoard.remove_piece(35)
+    gameBoard.add_piece(55, piece) # E4
+    gameBoard.check_board()
+
+
+def test_parse_fen_rejects_non_ascii_castling():
+    """ A non-ASCII castle character is an error, not an alias of the ASCII code point sharing its low byte.
+    """
+    with pytest.raises(UnicodeEncodeError):
+        board.parse_fen("4k3/8/8/8/8/8/8/4K2R w \u014b - 0 1")
@@ -0,0 +1,93 @@
+""" Checks the Polyglot position keys, and that moves keep the incremental key in step with a full rehash.
+"""
+import os
+
+import artifacts
+import bitboards
+import board
+import enums
+import hashkeys
+import menu
+import move
+from artifacts import Artifacts as art
+
+import pygame
+import pytest
+
+# Castle, en passant and promotion are all one move away for both sides.
+SPECIAL_MOVES_FEN = "r3k2r/1P6/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1"
+
+
+@pytest.fixture(scope = "module")
+def game():
+    """ Set up the pygame state move.Move needs to turn squares into clicks, without a window or sound.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    pygame.init()
+    pygame.display.set_mode(enums.Resolution.RES_1920_1080.value)
+
+    artifacts.import_img()
+    artifacts.calculate_resize(*enums.Resolution.RES_1920_1080.value, board.Board())
+    menu.Menu.mute = True
+
+    yield
+
+    pygame.quit()
+
+
+def click(sq120: int) -> tuple:
+    """ The mouse position at the centre of a 120sq.
+
+    :param sq120: The 120sq index to click.
+    :returns: The (x, y) values of the mouse.
+    """
+    sq64 = bitboards.square120ToSquare64[sq120]
+    tileWidth, tileHeight = art.fromTileSize
+
+    return ((sq64 % 8 + 0.5) * tileWidth, (7 - sq64 // 8 + 0.5) * tileHeight)
+
+
+def test_start_position_key():
+    """ The starting position hashes to its published Polyglot key.
+    """
+    gameBoard = board.Board()
+
+    assert gameBoard.posKey == 0x463b96181691fc9c
+    assert hashkeys.generate_pos_key(gameBoard) == 0x463b96181691fc9c
+
+
+def test_incremental_key_matches_rehash(game, board_from_fen):
+    """ Making and undoing moves keeps posKey equal to the key generated from scratch.
+    """
+    gameBoard = board_from_fen(SPECIAL_MOVES_FEN)
+    makeMove = move.Move()
+    keys = [gameBoard.posKey]
+
+    moves = [
+        (enums.Tiles.E1.value, enums.Tiles.G1.value, 0), # White castles kingside.
+        (enums.Tiles.E8.value, enums.Tiles.C8.value, 0), # Black castles queenside.
+        (enums.Tiles.E5.value, enums.Tiles.D6.value, 0), # En passant.
+        (enums.Tiles.H8.value, enums.Tiles.H1.value, 0), # Rook captures rook.
+        (enums.Tiles.B7.value, enums.Tiles.A8.value, enums.Piece.wQ.value), # Capture and promote to a queen.
+    ]
+
+    for from120, to120, promPiece in moves:
+        makeMove.set_from_index_120(click(from120), gameBoard)
+        makeMove.process_move(click(to120), gameBoard)
+
+        if promPiece:
+            makeMove.handle_prom(gameBoard, promPiece)
+
+        assert gameBoard.posKey == hashkeys.generate_pos_key(gameBoard)
+        keys.append(gameBoard.posKey)
+
+    # Every move changed the position, so no two keys match.
+    assert len(set(keys)) == len(keys)
+
+    for key in reversed(keys[:-1]):
+        makeMove.undo_move(gameBoard)
+
+        assert gameBoard.posKey == key
+        assert gameBoard.posKey == hashkeys.generate_pos_key(gameBoard)